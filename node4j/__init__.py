@@ -1,8 +1,11 @@
 # node4j/__init__.py
-node_registry = {}
-
 import logging
 
+from .registry import freeze_registry, node_registry, register_node
+
+# Nazwy z rejestru są re-eksportowane dla zgodności wstecznej (`from node4j import ...`)
+__all__ = ["node_registry", "register_node", "freeze_registry"]
+
 # 1. Uzyskaj logger dla całego pakietu 'node4j'.
 #    Każdy moduł wewnątrz pakietu, który wywoła `logging.getLogger(__name__)`,
 #    automatycznie odziedziczy ten logger i jego ustawienia.
@@ -15,6 +18,15 @@ log = logging.getLogger(__name__)
 #    Biblioteka NIGDY nie powinna zakładać, że logi mają iść na konsolę.
 log.addHandler(logging.NullHandler())
 
+# 3. Jeśli aplikacja używa handlerów blokujących (np. FileHandler), może
+#    przenieść ich obsługę do wątku w tle, aby logowanie z `connection.run`
+#    nie blokowało pętli asyncio:
+#
+#        from node4j.logging_setup import enable_async_logging
+#        enable_async_logging([logging.FileHandler("node4j.log")])
+#
+#    Przy zamykaniu aplikacji należy wywołać `disable_async_logging()`.
+
 # Opcjonalnie, możesz tu też wyeksportować kluczowe elementy biblioteki
 # from .nodes import Node
 # from .db import connection
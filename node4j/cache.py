@@ -0,0 +1,47 @@
+# node4j/cache.py
+from __future__ import annotations
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from .config import settings
+
+if TYPE_CHECKING:
+    from .nodes import Node
+
+# Ograniczony (LRU) cache węzłów hydratowanych przy pobieraniu relacji,
+# kluczowany parą (klasa modelu, elementId). Przy przechodzeniu grafu ten sam
+# sąsiad pojawia się wielokrotnie - trafienie pomija walidację pydantic.
+# Obok instancji trzymamy właściwości, z których powstała: jeśli baza zwróci
+# inne, węzeł jest walidowany ponownie, więc cache nie zwraca nieaktualnych
+# danych z bazy. Zwracane instancje są jednak współdzielone między pobraniami.
+_node_cache: OrderedDict[tuple[type, str], tuple[dict, "Node"]] = OrderedDict()
+_maxsize = settings.node_cache_size
+
+
+def enabled() -> bool:
+    """Czy cache węzłów jest włączony (`NODE4J_NODE_CACHE_SIZE` > 0)."""
+    return _maxsize > 0
+
+
+def get(model: type["Node"], element_id: str, props: dict) -> "Node | None":
+    """Zwraca zapamiętaną instancję, jeśli powstała z identycznych właściwości."""
+    key = (model, element_id)
+    entry = _node_cache.get(key)
+    if entry is None or entry[0] != props:
+        return None
+    _node_cache.move_to_end(key)
+    return entry[1]
+
+
+def put(model: type["Node"], element_id: str, props: dict, node: "Node") -> None:
+    """Zapamiętuje instancję, usuwając najdawniej używany wpis po przekroczeniu limitu."""
+    key = (model, element_id)
+    _node_cache[key] = (props, node)
+    _node_cache.move_to_end(key)
+    if len(_node_cache) > _maxsize:
+        _node_cache.popitem(last=False)
+
+
+def clear() -> None:
+    """Czyści cache węzłów, np. po zapisach wykonanych poza biblioteką."""
+    _node_cache.clear()
@@ -1,30 +1,66 @@
 # NOWY PLIK: node4j/config.py
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import dataclasses
+import os
 
-class Settings(BaseSettings):
+ENV_PREFIX = "NODE4J_"
+ENV_FILE = ".env"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Settings:
     """
-    Model Pydantic do zarządzania konfiguracją aplikacji.
-    Automatycznie wczytuje zmienne środowiskowe lub wartości z pliku .env.
-    Jest zgodny z najnowszą wersją pydantic-settings.
+    Konfiguracja biblioteki.
+    Wartości są wczytywane ze zmiennych środowiskowych z prefiksem `NODE4J_`
+    lub z pliku .env. Zmienne środowiskowe mają pierwszeństwo przed plikiem.
+    Celowo nie używamy `pydantic-settings`, aby `import node4j` był lekki.
     """
-    
-    # Zamiast wewnętrznej klasy `Config`, używamy `model_config` z `SettingsConfigDict`.
-    # To jest nowoczesny sposób konfiguracji w Pydantic V2.
-    model_config = SettingsConfigDict(
-        env_prefix='NODE4J_', 
-        env_file='.env', 
-        env_file_encoding='utf-8',
-        # Dodatkowa opcja, która może być przydatna: ignorowanie dodatkowych
-        # zmiennych środowiskowych, które nie pasują do modelu.
-        extra='ignore' 
-    )
-
-    # Definicja zmiennych konfiguracyjnych z typami i wartościami domyślnymi
-    # pozostaje bez zmian.
+
     uri: str = "bolt://127.0.0.1:7687"
     user: str = "neo4j"
     password: str = "password"
+    # Nazwa bazy danych podawana przy otwieraniu każdej sesji. Bez niej
+    # sterownik przed pierwszym zapytaniem sesji dopytuje serwer o bazę
+    # domyślną (dodatkowa podróż do bazy). Pusta = baza domyślna serwera.
+    database: str = ""
+    # Maksymalna liczba połączeń w puli sterownika oraz czas (w sekundach),
+    # przez jaki zapytanie czeka na wolne połączenie z puli.
+    max_connection_pool_size: int = 100
+    connection_acquisition_timeout: int = 60
+    # Liczba ostatnich zapytań przechowywanych w `connection.queries`
+    # (0 = historia wyłączona).
+    query_history_size: int = 0
+    # Maksymalna liczba węzłów w cache hydratowanych sąsiadów przy pobieraniu
+    # relacji (`node4j.cache`, 0 = cache wyłączony).
+    node_cache_size: int = 0
+    # Maksymalna liczba współbieżnie wykonywanych haków w operacjach bulk
+    # (0 = bez limitu).
+    bulk_hook_concurrency: int = 100
+
+    @classmethod
+    def load(cls, env_file: str | None = ENV_FILE) -> "Settings":
+        """Buduje ustawienia na podstawie pliku .env i zmiennych środowiskowych."""
+        file_values: dict[str, str | None] = {}
+        if env_file and os.path.isfile(env_file):
+            # python-dotenv importujemy tylko, gdy plik faktycznie istnieje
+            from dotenv import dotenv_values
+
+            file_values = dotenv_values(env_file, encoding="utf-8")
+
+        values = {}
+        for field in dataclasses.fields(cls):
+            env_name = f"{ENV_PREFIX}{field.name.upper()}"
+            # Nazwy zmiennych nie rozróżniają wielkości liter (jak w pydantic-settings)
+            raw = os.environ.get(env_name, os.environ.get(env_name.lower()))
+            if raw is None:
+                raw = file_values.get(env_name, file_values.get(env_name.lower()))
+            if raw is None:
+                continue
+            # Ignorujemy dodatkowe zmienne; konwertujemy tylko znane typy pól
+            values[field.name] = int(raw) if field.type is int else raw
+
+        return cls(**values)
+
 
-# Tworzymy globalną instancję singletona, która będzie importowana 
+# Tworzymy globalną instancję singletona, która będzie importowana
 # w innych częściach aplikacji.
-settings = Settings()
\ No newline at end of file
+settings = Settings.load()
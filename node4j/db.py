@@ -1,22 +1,51 @@
 # node4j/db.py
 from __future__ import annotations
-import os
-import functools
+import asyncio
+import collections
 from contextvars import ContextVar
 import logging  # ### ZMIANA ###
 import time     # ### ZMIANA ###
-from neo4j import AsyncGraphDatabase, basic_auth, AsyncTransaction
+from typing import TYPE_CHECKING
+from collections.abc import AsyncIterator
+from neo4j import AsyncGraphDatabase, basic_auth, READ_ACCESS, WRITE_ACCESS
 from contextlib import asynccontextmanager
 
+import structlog
+
 from .config import settings
+from .logging_setup import get_logger
+
+if TYPE_CHECKING:
+    # Typy używane wyłącznie w adnotacjach - nie importujemy ich w czasie wykonania
+    from neo4j import AsyncSession, AsyncTransaction
 
-# ### ZMIANA ###: Inicjalizacja loggera dla tego modułu
-log = logging.getLogger(__name__)
+# Logger structlog - kontekst transakcji (`tx_id`) jest dołączany automatycznie
+log = get_logger(__name__)
+
+# Wartości konfiguracyjne odczytujemy raz przy imporcie - nie zmieniają się
+# w trakcie działania aplikacji.
+_DB_URI, _DB_USER, _DB_PASS = settings.uri, settings.user, settings.password
+_DB_NAME = settings.database or None
+_HAS_APOC_QUERY = (
+    "SHOW PROCEDURES YIELD name WHERE name STARTS WITH 'apoc.' "
+    "RETURN count(*) > 0 AS has_apoc"
+)
+# Ustawienia puli połączeń sterownika (keep_alive jest domyślnie włączone)
+_DRIVER_KWARGS = {
+    "max_connection_pool_size": settings.max_connection_pool_size,
+    "connection_acquisition_timeout": settings.connection_acquisition_timeout,
+}
+# Argumenty wspólne dla wszystkich otwieranych sesji
+_SESSION_KWARGS = {"database": _DB_NAME} if _DB_NAME else {}
 
 _current_transaction: ContextVar[AsyncTransaction | None] = ContextVar(
     "current_transaction", default=None
 )
 
+_current_session: ContextVar[AsyncSession | None] = ContextVar(
+    "current_session", default=None
+)
+
 class AsyncDatabase:
     """
     Nowoczesna, asynchroniczna klasa do obsługi połączenia z Neo4j.
@@ -25,8 +54,15 @@ class AsyncDatabase:
 
     def __init__(self):
         self.driver = None
-        # Zachowujemy tę listę jako prosty, wewnętrzny mechanizm historii zapytań
-        self.queries = []
+        # Docelowa baza danych (None = baza domyślna serwera)
+        self.database = _DB_NAME
+        # Czy serwer ma zainstalowane APOC (ustalane przy pierwszym has_apoc())
+        self._has_apoc: bool | None = None
+        # Ograniczona historia ostatnich zapytań (do debugowania). Domyślnie
+        # wyłączona, aby nie przetrzymywać referencji do parametrów zapytań.
+        self.queries: collections.deque[tuple[str, dict | None]] = collections.deque(
+            maxlen=settings.query_history_size
+        )
 
     async def connect(self):
         """
@@ -38,16 +74,18 @@ class AsyncDatabase:
         # ### ZMIANA ###: Logowanie próby połączenia (bez hasła!)
         log.info(
             "Attempting to connect to Neo4j database",
-            extra={"db_uri": settings.uri, "db_user": settings.user},
+            db_uri=_DB_URI,
+            db_user=_DB_USER,
         )
         
         try:
             self.driver = AsyncGraphDatabase.driver(
-                settings.uri,
+                _DB_URI,
                 auth=basic_auth(
-                    settings.user,
-                    settings.password,
+                    _DB_USER,
+                    _DB_PASS,
                 ),
+                **_DRIVER_KWARGS,
             )
             await self.driver.verify_connectivity()
             # ### ZMIANA ###: Usunięcie print, zastąpienie loggerem
@@ -56,12 +94,54 @@ class AsyncDatabase:
             # ### ZMIANA ###: Logowanie błędu połączenia
             log.exception(
                 "Failed to connect to Neo4j database",
-                extra={"db_uri": settings.uri, "error_type": type(e).__name__},
+                db_uri=_DB_URI,
+                error_type=type(e).__name__,
             )
             self.driver = None # Upewniamy się, że driver jest None w razie błędu
             raise # Rzucamy wyjątek dalej, aby aplikacja mogła zareagować
 
 
+    async def warmup(self, n: int = 10) -> None:
+        """
+        Rozgrzewa pulę połączeń sterownika: otwiera `n` równoległych sesji
+        i w każdej wykonuje `RETURN 1`. Dzięki temu koszt nawiązania połączeń
+        (m.in. uzgadnianie TLS) ponosimy na starcie aplikacji, a nie przy
+        pierwszych zapytaniach. Należy wywołać raz, po `connect()`.
+
+        Pula należy do sterownika, dlatego `connection` musi pozostać
+        singletonem modułu - nie należy tworzyć własnych `AsyncDatabase`
+        dla każdego żądania.
+
+        :param n: Liczba połączeń do otwarcia (nie więcej niż rozmiar puli).
+        """
+        if not self.driver:
+            await self.connect()
+
+        async def ping():
+            async with self.driver.session(**_SESSION_KWARGS) as session:
+                response = await session.run("RETURN 1")
+                await response.consume()
+
+        start_ns = time.perf_counter_ns()
+        await asyncio.gather(*(ping() for _ in range(n)))
+        log.info(
+            "Connection pool warmed up.",
+            connections=n,
+            duration_ms=round((time.perf_counter_ns() - start_ns) / 1_000_000, 2),
+        )
+
+    async def has_apoc(self) -> bool:
+        """
+        Sprawdza (raz na połączenie), czy na serwerze są dostępne procedury
+        APOC. Pozwala wybrać ścieżkę z góry, zamiast wywoływać procedurę APOC
+        i obsługiwać błąd, gdy jej nie ma.
+        """
+        if self._has_apoc is None:
+            result = await self.run(_HAS_APOC_QUERY)
+            self._has_apoc = bool(result and result[0]["has_apoc"])
+            log.info("APOC availability checked.", has_apoc=self._has_apoc)
+        return self._has_apoc
+
     async def close(self):
         """
         Zamyka połączenie z bazą danych. Powinno być wywołane przy zamykaniu aplikacji.
@@ -69,6 +149,7 @@ class AsyncDatabase:
         if self.driver:
             await self.driver.close()
             self.driver = None
+            self._has_apoc = None
             # ### ZMIANA ###: Usunięcie print, zastąpienie loggerem
             log.info("Disconnected from Neo4j.")
 
@@ -86,9 +167,10 @@ class AsyncDatabase:
         if not self.driver:
             await self.connect()
 
-        async with self.driver.session() as session:
+        async with self.driver.session(**_SESSION_KWARGS) as session:
             tx = await session.begin_transaction()
             token = _current_transaction.set(tx)
+            ctx_tokens = structlog.contextvars.bind_contextvars(tx_id=id(tx))
             # ### ZMIANA ###: Logowanie rozpoczęcia transakcji
             log.debug("Beginning new transaction.")
             try:
@@ -104,18 +186,65 @@ class AsyncDatabase:
                     log.warning("Transaction rolled back due to an exception.", exc_info=True)
                 raise
             finally:
+                structlog.contextvars.reset_contextvars(**ctx_tokens)
                 _current_transaction.reset(token)
 
-    def atomic(self):
+    @asynccontextmanager
+    async def session(self, *, read_only: bool = False):
+        """
+        Asynchroniczny menedżer kontekstu otwierający jedną sesję, która jest
+        współdzielona przez wszystkie zapytania `run()` bez transakcji w danym
+        kontekście. Pozwala uniknąć otwierania nowej sesji dla każdego zapytania.
+
+        Sesja nie jest bezpieczna współbieżnie - nie należy uruchamiać
+        równoległych zapytań (np. `asyncio.gather`) wewnątrz tego bloku.
+
+        :param read_only: Otwiera sesję w trybie READ, co w klastrze pozwala
+                          kierować zapytania do replik odczytu.
+        """
+        if _current_session.get() is not None:
+            # Zagnieżdżone wywołanie po prostu korzysta z istniejącej sesji
+            yield _current_session.get()
+            return
+
+        if not self.driver:
+            await self.connect()
+
+        access_mode = READ_ACCESS if read_only else WRITE_ACCESS
+        async with self.driver.session(
+            default_access_mode=access_mode, **_SESSION_KWARGS
+        ) as session:
+            token = _current_session.set(session)
+            log.debug("Opened shared session.", access_mode=access_mode)
+            try:
+                yield session
+            finally:
+                _current_session.reset(token)
+                log.debug("Closed shared session.")
+
+    def atomic(self, func=None):
         """
         Dekorator do opakowywania funkcji w transakcję atomową.
+        Można go używać zarówno jako `@connection.atomic`, jak i `@connection.atomic()`.
         """
         def decorator(func):
-            @functools.wraps(func)
+            # Wiążemy metodę raz, przy dekorowaniu, a nie przy każdym wywołaniu
+            transaction = self.transaction
+
             async def wrapper(*args, **kwargs):
-                async with self.transaction():
+                async with transaction():
                     return await func(*args, **kwargs)
+
+            # Kopiujemy tylko podstawowe metadane (bez pełnego functools.wraps)
+            wrapper.__wrapped__ = func
+            wrapper.__name__ = func.__name__
+            wrapper.__qualname__ = func.__qualname__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__module__ = func.__module__
             return wrapper
+
+        if func is not None:
+            return decorator(func)
         return decorator
 
     async def run(
@@ -132,54 +261,144 @@ class AsyncDatabase:
         if not self.driver:
             await self.connect()
 
-        # Zachowujemy tę listę dla wewnętrznych potrzeb lub prostego debugowania
-        self.queries.append((query, params))
+        # Historia zapytań dla prostego debugowania (tylko gdy włączona)
+        if self.queries.maxlen:
+            self.queries.append((query, params))
 
         active_tx = tx or _current_transaction.get()
         in_explicit_tx = active_tx is not None
-        
+
+        # Poziomy logowania sprawdzamy raz, aby nie budować pól logu
+        # na gorącej ścieżce, gdy i tak nie zostaną wyemitowane.
+        debug_enabled = log.isEnabledFor(logging.DEBUG)
+        info_enabled = log.isEnabledFor(logging.INFO)
+
         # ### ZMIANA ###: Kompleksowe logowanie wykonania zapytania
-        log.debug(
-            "Executing Cypher query",
-            extra={
-                "cypher_query": query,
-                "cypher_params": params,
-                "in_transaction": in_explicit_tx,
-            },
-        )
-        start_time = time.perf_counter()
+        if debug_enabled:
+            log.debug(
+                "Executing Cypher query",
+                cypher_query=query,
+                cypher_params=params,
+                in_transaction=in_explicit_tx,
+            )
+        start_ns = time.perf_counter_ns()
         
         try:
             if in_explicit_tx:
                 response = await active_tx.run(query, params)
                 data = await response.data()
+            elif (shared_session := _current_session.get()) is not None:
+                response = await shared_session.run(query, params)
+                data = await response.data()
             else:
-                async with self.driver.session() as session:
+                async with self.driver.session(**_SESSION_KWARGS) as session:
                     response = await session.run(query, params)
                     data = await response.data()
             
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            log.info(
-                "Query executed successfully",
-                extra={
+            if info_enabled:
+                duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+                log.info(
+                    "Query executed successfully",
                     # Powtórzenie zapytania w logu INFO może być przydatne do korelacji
-                    "cypher_query": query,
-                    "duration_ms": round(duration_ms, 2),
-                    "record_count": len(data),
-                },
-            )
+                    cypher_query=query,
+                    duration_ms=round(duration_ms, 2),
+                    record_count=len(data),
+                )
             return data
         except Exception as e:
-            duration_ms = (time.perf_counter() - start_time) * 1000
+            # Błędy logujemy zawsze, niezależnie od poziomu
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             log.error(
                 "Query execution failed",
                 exc_info=True, # Automatycznie dodaje traceback
-                extra={
-                    "cypher_query": query,
-                    "cypher_params": params,
-                    "duration_ms": round(duration_ms, 2),
-                    "error_type": type(e).__name__,
-                },
+                cypher_query=query,
+                cypher_params=params,
+                duration_ms=round(duration_ms, 2),
+                error_type=type(e).__name__,
+            )
+            raise
+
+    async def stream(
+        self,
+        query: str,
+        params: dict | None = None,
+        *,
+        tx: "AsyncTransaction" | None = None,
+        fetch_size: int | None = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Wykonuje zapytanie Cypher i zwraca rekordy pojedynczo, w miarę ich
+        napływania z bazy, zamiast budować pełną listę jak `run()`.
+        Przydatne dla dużych wyników (eksporty, strumienie GDS).
+
+        Uwaga: poza transakcją sesja pozostaje otwarta do wyczerpania
+        (lub zamknięcia przez `aclose()`) generatora.
+
+        :param fetch_size: Liczba rekordów pobieranych z serwera w jednej
+                           paczce. Dotyczy tylko sesji otwieranej dla tego
+                           wywołania (transakcja i współdzielona sesja mają
+                           własne ustawienia).
+        """
+        if not self.driver:
+            await self.connect()
+
+        if self.queries.maxlen:
+            self.queries.append((query, params))
+
+        active_tx = tx or _current_transaction.get()
+        in_explicit_tx = active_tx is not None
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Streaming Cypher query",
+                cypher_query=query,
+                cypher_params=params,
+                in_transaction=in_explicit_tx,
+            )
+        start_ns = time.perf_counter_ns()
+        record_count = 0
+
+        try:
+            if in_explicit_tx:
+                response = await active_tx.run(query, params)
+                async for record in response:
+                    record_count += 1
+                    yield record.data()
+            elif (shared_session := _current_session.get()) is not None:
+                response = await shared_session.run(query, params)
+                async for record in response:
+                    record_count += 1
+                    yield record.data()
+            else:
+                session_kwargs = (
+                    _SESSION_KWARGS
+                    if fetch_size is None
+                    else {**_SESSION_KWARGS, "fetch_size": fetch_size}
+                )
+                async with self.driver.session(**session_kwargs) as session:
+                    response = await session.run(query, params)
+                    async for record in response:
+                        record_count += 1
+                        yield record.data()
+
+            if log.isEnabledFor(logging.INFO):
+                duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+                log.info(
+                    "Query stream finished",
+                    cypher_query=query,
+                    duration_ms=round(duration_ms, 2),
+                    record_count=record_count,
+                )
+        except Exception as e:
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+            log.error(
+                "Query stream failed",
+                exc_info=True,
+                cypher_query=query,
+                cypher_params=params,
+                duration_ms=round(duration_ms, 2),
+                record_count=record_count,
+                error_type=type(e).__name__,
             )
             raise
 
@@ -1,15 +1,40 @@
 # node4j/ext/apoc.py
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any
-import logging  # ### ZMIANA ###
-
+from typing import TYPE_CHECKING, Any, Final
 from node4j.db import connection
+from node4j.logging_setup import get_logger
 
 if TYPE_CHECKING:
     from ..nodes import Node
 
-# ### ZMIANA ###: Inicjalizacja loggera dla modułu
-log = logging.getLogger(__name__)
+# Logger structlog - kontekst (np. `tx_id`) jest dołączany automatycznie
+log = get_logger(__name__)
+
+# Stałe zapytania Cypher - budowane raz przy imporcie modułu
+_Q_VERSION: Final[str] = "RETURN apoc.version() as version"
+_Q_PERIODIC_ITERATE: Final[str] = (
+    "CALL apoc.periodic.iterate($cypher_to_iterate, $cypher_to_execute, "
+    "{batchSize: $batch_size})"
+)
+_Q_EXPORT_JSON_ALL: Final[str] = "CALL apoc.export.json.all($file_name, $config)"
+_Q_TRIGGER_INSTALL: Final[str] = (
+    "CALL apoc.trigger.install('neo4j', $name, $cypher, $selector, $config)"
+)
+_Q_TRIGGER_INSTALL_MANY: Final[str] = (
+    "UNWIND $triggers AS t "
+    "CALL apoc.trigger.install('neo4j', t.name, t.cypher, t.selector, t.config) "
+    "YIELD name RETURN name"
+)
+_Q_TRIGGER_DROP: Final[str] = "CALL apoc.trigger.drop($name)"
+_Q_TRIGGER_DROP_ALL: Final[str] = "CALL apoc.trigger.dropAll()"
+_Q_TRIGGER_LIST: Final[str] = "CALL apoc.trigger.list()"
+_Q_CREATE_FROM_JSON: Final[str] = """
+        CALL apoc.periodic.iterate(
+            'CALL apoc.load.json($url, $path) YIELD value as row RETURN row',
+            $cypher_to_execute,
+            {batchSize: $batch_size, parallel: false}
+        )
+        """
 
 # ===================================================================
 # CZĘŚĆ 1: Globalna biblioteka pomocnicza dla procedur APOC
@@ -26,7 +51,7 @@ class APOC:
     async def version() -> str | None:
         """Zwraca wersję zainstalowanej biblioteki APOC."""
         log.debug("Fetching APOC version.")
-        result = await connection.run("RETURN apoc.version() as version")
+        result = await connection.run(_Q_VERSION)
         version = result[0]["version"] if result else None
         if version:
             log.info(f"APOC version found: {version}")
@@ -46,15 +71,15 @@ class APOC:
             """Wykonuje operacje w batchach, opakowując `apoc.periodic.iterate`."""
             log.info(
                 "Executing periodic iterate.",
-                extra={"batch_size": batch_size, "iterate_query": cypher_to_iterate},
+                batch_size=batch_size,
+                iterate_query=cypher_to_iterate,
             )
-            query = "CALL apoc.periodic.iterate($cypher_to_iterate, $cypher_to_execute, {batchSize: $batch_size})"
             params = {
                 "cypher_to_iterate": cypher_to_iterate,
                 "cypher_to_execute": cypher_to_execute,
                 "batch_size": batch_size,
             }
-            await connection.run(query, params)
+            await connection.run(_Q_PERIODIC_ITERATE, params)
             log.info("Periodic iterate finished.")
 
 
@@ -62,10 +87,9 @@ class APOC:
         @staticmethod
         async def to_json(file_name: str, config: dict | None = None):
             """Eksportuje całą bazę do pliku JSON."""
-            log.info(f"Exporting database to JSON file.", extra={"file_name": file_name, "config": config})
+            log.info("Exporting database to JSON file.", file_name=file_name, config=config)
             config = config or {}
-            query = "CALL apoc.export.json.all($file_name, $config)"
-            await connection.run(query, {"file_name": file_name, "config": config})
+            await connection.run(_Q_EXPORT_JSON_ALL, {"file_name": file_name, "config": config})
             log.info(f"Database export to '{file_name}' finished.")
 
 
@@ -76,21 +100,46 @@ class APOC:
             """Tworzy i instaluje nowy trigger w bazie danych."""
             log.info(f"Installing APOC trigger '{name}'.")
             config = config or {}
-            query = "CALL apoc.trigger.install('neo4j', $name, $cypher, $selector, $config)"
             await connection.run(
-                query,
+                _Q_TRIGGER_INSTALL,
                 {"name": name, "cypher": cypher, "selector": selector, "config": config},
             )
             # ### ZMIANA ###: Zastąpienie print loggerem
             log.info(f"Successfully installed trigger: '{name}'")
 
+        @staticmethod
+        async def install_many(triggers: list[dict]) -> list[str]:
+            """
+            Instaluje wiele triggerów w jednym zapytaniu (UNWIND).
+
+            :param triggers: Lista słowników z kluczami `name`, `cypher`,
+                             `selector` oraz opcjonalnie `config`.
+            :return: Lista nazw zainstalowanych triggerów.
+            """
+            if not triggers:
+                return []
+
+            log.info(f"Installing {len(triggers)} APOC triggers.")
+            payload = [
+                {
+                    "name": t["name"],
+                    "cypher": t["cypher"],
+                    "selector": t["selector"],
+                    "config": t.get("config") or {},
+                }
+                for t in triggers
+            ]
+            result = await connection.run(_Q_TRIGGER_INSTALL_MANY, {"triggers": payload})
+            names = [row["name"] for row in result]
+            log.info(f"Successfully installed {len(names)} triggers.")
+            return names
+
 
         @staticmethod
         async def remove(name: str) -> dict:
             """Usuwa trigger o podanej nazwie."""
             log.info(f"Removing APOC trigger '{name}'.")
-            query = "CALL apoc.trigger.drop($name)"
-            result = await connection.run(query, {"name": name})
+            result = await connection.run(_Q_TRIGGER_DROP, {"name": name})
             # ### ZMIANA ###: Zastąpienie print loggerem
             log.info(f"Successfully removed trigger: '{name}'")
             return result[0] if result else {}
@@ -100,8 +149,7 @@ class APOC:
         async def remove_all() -> dict:
             """Usuwa wszystkie triggery z bazy."""
             log.info("Removing all APOC triggers.")
-            query = "CALL apoc.trigger.dropAll()"
-            result = await connection.run(query)
+            result = await connection.run(_Q_TRIGGER_DROP_ALL)
             # ### ZMIANA ###: Zastąpienie print loggerem
             log.info("Successfully removed all triggers.")
             return result[0] if result else {}
@@ -111,8 +159,7 @@ class APOC:
         async def list() -> list[dict]:
             """Zwraca listę wszystkich zainstalowanych triggerów."""
             log.debug("Listing all APOC triggers.")
-            query = "CALL apoc.trigger.list()"
-            return await connection.run(query)
+            return await connection.run(_Q_TRIGGER_LIST)
 
 
 
@@ -134,40 +181,33 @@ class ApocManager:
     def __init__(self, node_model: type[Node]):
         self.model = node_model
         # ### ZMIANA ###: Logger specyficzny dla modelu
-        self.log = log.getChild(f"ApocManager.{self.model.__name__}")
+        self.log = get_logger(f"{__name__}.ApocManager.{self.model.__name__}")
+        # Etykiety modelu są stałe, więc zapytanie tworzące węzły budujemy raz
+        self._labels_str = node_model._labels_cypher
+        self._cypher_to_execute = (
+            f"CREATE (n{self._labels_str}) SET n = row, n.uid = apoc.create.uuid()"
+        )
 
     async def create_from_json(
         self, file_url: str, json_path: str = "$", batch_size: int = 1000
     ) -> dict:
         """Wydajnie tworzy węzły na podstawie danych z pliku JSON."""
         self.log.info(
-            f"Creating nodes from JSON.",
-            extra={
-                "model": self.model.__name__,
-                "file_url": file_url,
-                "json_path": json_path,
-                "batch_size": batch_size,
-            },
+            "Creating nodes from JSON.",
+            model=self.model.__name__,
+            file_url=file_url,
+            json_path=json_path,
+            batch_size=batch_size,
         )
-        labels = ":" + ":".join(self.model.labels())
-        cypher_to_execute = f"CREATE (n{labels}) SET n = row, n.uid = apoc.create.uuid()"
-
-        query = """
-        CALL apoc.periodic.iterate(
-            'CALL apoc.load.json($url, $path) YIELD value as row RETURN row',
-            $cypher_to_execute,
-            {batchSize: $batch_size, parallel: false}
-        )
-        """
         params = {
             "url": file_url,
             "path": json_path,
-            "cypher_to_execute": cypher_to_execute,
+            "cypher_to_execute": self._cypher_to_execute,
             "batch_size": batch_size,
         }
 
-        result = await connection.run(query, params)
-        self.log.info(f"Finished creating nodes from JSON.", extra={"result": result})
+        result = await connection.run(_Q_CREATE_FROM_JSON, params)
+        self.log.info("Finished creating nodes from JSON.", result=result)
         return result[0] if result else {}
 
     # Tutaj można dodać inne metody specyficzne dla modelu, np. create_from_csv
@@ -183,7 +223,7 @@ def install_apoc_manager(model_class: type[Node]):
     """Instaluje ApocManager na klasie modelu jako atrybut `.apoc`."""
     if not hasattr(model_class, "apoc"):
         # ### ZMIANA ###: Dodajemy logowanie instalacji
-        manager_log = log.getChild(f"ApocManager.{model_class.__name__}")
+        manager_log = get_logger(f"{__name__}.ApocManager.{model_class.__name__}")
         manager_log.debug("Installing ApocManager on model.")
         model_class.apoc = ApocManager(model_class)
 
@@ -1,11 +1,33 @@
 # node4j/ext/gds.py
+import functools
 import logging  # ### ZMIANA ###
+import re
 from node4j.db import connection
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Any, Final
 
 # ### ZMIANA ###: Inicjalizacja loggera dla modułu
 log = logging.getLogger(__name__)
 
+# Stałe zapytania Cypher - budowane raz przy imporcie modułu
+_Q_GRAPH_PROJECT: Final[str] = (
+    "CALL gds.graph.project($graph_name, $node_projection, $relationship_projection)"
+)
+_Q_GRAPH_DROP: Final[str] = "CALL gds.graph.drop($graph_name)"
+
+# Dozwolone nazwy procedur GDS - nazwa algorytmu jest wstawiana do zapytania,
+# więc musi być zwalidowana, aby uniknąć wstrzyknięcia Cypher.
+_ALGO_NAME_RE = re.compile(r"^gds\.[a-zA-Z0-9_.]+$")
+
+
+@functools.lru_cache(maxsize=128)
+def _build_algo_query(algo: str) -> str:
+    """Waliduje nazwę procedury GDS i zwraca (zapamiętane) zapytanie CALL."""
+    if not _ALGO_NAME_RE.match(algo):
+        raise ValueError(f"Niepoprawna nazwa procedury GDS: '{algo}'.")
+    # Bez YIELD - różne algorytmy zwracają różne kolumny
+    return f"CALL {algo}($graph_name, $config)"
+
 
 class GDS:
     """
@@ -22,16 +44,16 @@ class GDS:
             https://neo4j.com/docs/graph-data-science/current/management/graph-project/
             """
             # ### ZMIANA ###: Logowanie operacji
-            log.info(
-                f"Projecting GDS graph '{graph_name}'.",
-                extra={
-                    "node_projection": node_projection,
-                    "relationship_projection": relationship_projection,
-                },
-            )
-            query = "CALL gds.graph.project($graph_name, $node_projection, $relationship_projection)"
+            if log.isEnabledFor(logging.INFO):
+                log.info(
+                    "Projecting GDS graph '%s'.", graph_name,
+                    extra={
+                        "node_projection": node_projection,
+                        "relationship_projection": relationship_projection,
+                    },
+                )
             result = await connection.run(
-                query,
+                _Q_GRAPH_PROJECT,
                 {
                     "graph_name": graph_name,
                     "node_projection": node_projection,
@@ -39,18 +61,17 @@ class GDS:
                 },
             )
             res_data = result[0] if result else {}
-            log.info(f"GDS graph '{graph_name}' projected successfully.", extra=res_data)
+            log.info("GDS graph '%s' projected successfully.", graph_name, extra=res_data)
             return res_data
 
         @staticmethod
         async def drop(graph_name: str) -> dict:
             """Usuwa projekcję grafu z pamięci."""
             # ### ZMIANA ###: Logowanie operacji
-            log.info(f"Dropping GDS graph '{graph_name}'.")
-            query = "CALL gds.graph.drop($graph_name)"
-            result = await connection.run(query, {"graph_name": graph_name})
+            log.info("Dropping GDS graph '%s'.", graph_name)
+            result = await connection.run(_Q_GRAPH_DROP, {"graph_name": graph_name})
             res_data = result[0] if result else {}
-            log.info(f"GDS graph '{graph_name}' dropped successfully.", extra=res_data)
+            log.info("GDS graph '%s' dropped successfully.", graph_name, extra=res_data)
             return res_data
 
     class Algo:
@@ -58,21 +79,38 @@ class GDS:
         async def run(graph_name: str, algo: str, config: dict) -> list[dict]:
             """
             Uruchamia algorytm GDS (np. PageRank) w trybie `stream`.
+            Zwraca pełną listę wyników - dla dużych wyników użyj `stream`.
             Przykład algo: 'gds.pageRank.stream'
             """
             # ### ZMIANA ###: Logowanie operacji
-            log.info(
-                f"Running GDS algorithm '{algo}' in stream mode on graph '{graph_name}'.",
-                extra={"config": config},
-            )
-            # Budujemy dynamicznie zapytanie
-            # UWAGA: YIELD może zwracać różne kolumny, więc na razie logujemy ogólnie
-            query = f"CALL {algo}($graph_name, $config)" # Usunięto YIELD dla ogólności
+            if log.isEnabledFor(logging.INFO):
+                log.info(
+                    "Running GDS algorithm '%s' in stream mode on graph '%s'.", algo, graph_name,
+                    extra={"config": config},
+                )
+            query = _build_algo_query(algo)
             params = {"graph_name": graph_name, "config": config}
             result = await connection.run(query, params)
-            log.info(f"GDS algorithm '{algo}' finished, returned {len(result)} records.")
+            log.info("GDS algorithm '%s' finished, returned %s records.", algo, len(result))
             return result
 
+        @staticmethod
+        async def stream(graph_name: str, algo: str, config: dict) -> AsyncIterator[dict]:
+            """
+            Jak `run`, ale zwraca rekordy pojedynczo, w miarę napływania z bazy,
+            bez buforowania całego wyniku. Zalecane dla dużych grafów.
+            Przykład algo: 'gds.pageRank.stream'
+            """
+            if log.isEnabledFor(logging.INFO):
+                log.info(
+                    "Streaming GDS algorithm '%s' results from graph '%s'.", algo, graph_name,
+                    extra={"config": config},
+                )
+            query = _build_algo_query(algo)
+            params = {"graph_name": graph_name, "config": config}
+            async for record in connection.stream(query, params):
+                yield record
+
         @staticmethod
         async def mutate(graph_name: str, algo: str, config: dict) -> dict:
             """
@@ -80,15 +118,16 @@ class GDS:
             Przykład algo: 'gds.pageRank.mutate'
             """
             # ### ZMIANA ###: Logowanie operacji
-            log.info(
-                f"Running GDS algorithm '{algo}' in mutate mode on graph '{graph_name}'.",
-                extra={"config": config},
-            )
-            query = f"CALL {algo}($graph_name, $config)"
+            if log.isEnabledFor(logging.INFO):
+                log.info(
+                    "Running GDS algorithm '%s' in mutate mode on graph '%s'.", algo, graph_name,
+                    extra={"config": config},
+                )
+            query = _build_algo_query(algo)
             params = {"graph_name": graph_name, "config": config}
             result = await connection.run(query, params)
             res_data = result[0] if result else {}
-            log.info(f"GDS algorithm '{algo}' mutation finished.", extra=res_data)
+            log.info("GDS algorithm '%s' mutation finished.", algo, extra=res_data)
             return res_data
 
 
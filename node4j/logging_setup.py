@@ -0,0 +1,93 @@
+# node4j/logging_setup.py
+from __future__ import annotations
+import logging
+import logging.handlers
+import queue
+from collections.abc import Iterable
+
+import structlog
+
+# Procesory structlog używane przez loggery biblioteki. Nie konfigurujemy
+# globalnie `structlog.configure` - to zadanie aplikacji. Rekordy trafiają
+# do standardowego `logging` (a więc do NullHandler / handlerów użytkownika),
+# a kontekst z `contextvars` (np. `tx_id`) jest dołączany automatycznie.
+_STRUCTLOG_PROCESSORS = [
+    structlog.stdlib.filter_by_level,
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.render_to_log_kwargs,
+]
+
+
+def get_logger(name: str) -> structlog.stdlib.BoundLogger:
+    """
+    Zwraca logger structlog opakowujący standardowy logger o podanej nazwie.
+    Pola przekazane jako argumenty nazwane trafiają do `extra` rekordu.
+    """
+    return structlog.wrap_logger(
+        logging.getLogger(name),
+        processors=_STRUCTLOG_PROCESSORS,
+        wrapper_class=structlog.stdlib.BoundLogger,
+    )
+
+
+log = logging.getLogger(__name__)
+
+# Aktywny listener (jeden na proces), aby można go było poprawnie zatrzymać
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.handlers.QueueHandler | None = None
+
+
+def enable_async_logging(
+    handlers: Iterable[logging.Handler], queue_size: int = 10000
+) -> logging.handlers.QueueListener:
+    """
+    Przenosi obsługę logów pakietu `node4j` do wątku w tle.
+
+    Logger `node4j` dostaje jedynie `QueueHandler`, który wrzuca rekordy do
+    kolejki, a właściwe handlery (plik, konsola, ...) są wywoływane przez
+    `QueueListener` w osobnym wątku. Dzięki temu logowanie w `connection.run`
+    nie blokuje pętli asyncio na operacjach I/O.
+
+    :param handlers: Handlery, które mają faktycznie zapisywać logi.
+    :param queue_size: Maksymalny rozmiar kolejki (0 = bez limitu).
+    :return: Uruchomiony `QueueListener`.
+    """
+    global _listener, _queue_handler
+
+    if _listener is not None:
+        disable_async_logging()
+
+    handlers = list(handlers)
+    if not handlers:
+        raise ValueError("enable_async_logging wymaga co najmniej jednego handlera.")
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+
+    package_logger = logging.getLogger("node4j")
+    package_logger.addHandler(_queue_handler)
+    _listener.start()
+
+    log.debug(
+        "Async logging enabled.",
+        extra={"handler_count": len(handlers), "queue_size": queue_size},
+    )
+    return _listener
+
+
+def disable_async_logging() -> None:
+    """
+    Zatrzymuje listener (opróżniając kolejkę) i odpina `QueueHandler`
+    od loggera `node4j`. Powinno być wywołane przy zamykaniu aplikacji.
+    """
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger("node4j").removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,13 +1,20 @@
 # node4j/manager.py
 from __future__ import annotations
-from typing import Type, Any, TYPE_CHECKING, Optional
+from typing import Annotated, Type, Any, TYPE_CHECKING, Optional
+from collections.abc import AsyncIterator, Awaitable, Iterable
+import asyncio
+import datetime
+import functools
+import re
 import uuid
 import neo4j  # +++ NOWY IMPORT +++
 import logging  # ### ZMIANA ###
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
 
 
-from .db import connection, _current_transaction
-from .registry import node_registry
+from .config import settings
+from .db import connection, _current_transaction, _current_session
 from .properties import RelationshipDirection
 from .query import Q  # <-- NOWY IMPORT
 
@@ -21,28 +28,164 @@ log = logging.getLogger(__name__)
 
 LABEL_TYPE_MARKER = ":"
 
-# +++ NOWA FUNKCJA POMOCNICZA (Twoja propozycja) +++
+# Kontrakt identyfikatorów: wartości, których Cypher nie pozwala przekazać
+# jako parametry (typy relacji, klucze w dopasowaniu wzorca), są wstawiane
+# do tekstu zapytania i dlatego MUSZĄ pasować do tego wzorca. Wszystkie
+# pozostałe wartości trafiają wyłącznie do parametrów - stały tekst zapytania
+# pozwala też bazie ponownie używać zbuforowanych planów wykonania.
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Znacznik końca strumienia rekordów w match_all
+_END_OF_STREAM = object()
+
+# Tymczasowa właściwość, po której rozpoznajemy, że MERGE utworzył węzeł
+_CREATED_MARKER = "__node4j_created"
+
+# Alias węzła w zapytaniach menedżera jest stały, więc szablony zapytań są
+# stałymi modułu - przy wywołaniu wstawiamy tylko etykiety i klauzule
+# (`str.format_map`), zamiast składać cały tekst f-stringami.
+_NODE_ALIAS = "node"
+_CREATE_TMPL = "CREATE (node{labels}) {set} RETURN elementId(node) as internal_id"
+_MATCH_ONE_TMPL = "MATCH (node{labels}) {where} {ret} LIMIT 1"
+_MATCH_ALL_TMPL = "MATCH (node{labels}) {where} {ret} {order}"
+_VALUES_TMPL = "MATCH (node{labels}) {where} RETURN {columns} {order}"
+_MATCH_IN_TMPL = "UNWIND $values AS value MATCH (node{labels} {{{key}: value}}) {where} {ret}"
+_UPDATE_TMPL = "MATCH (node{labels}) {where} SET node += $data RETURN count(node) AS c"
+_UPDATE_RETURNING_TMPL = "MATCH (node{labels}) {where} SET node += $data {ret}"
+_INCREMENT_TMPL = (
+    "MATCH (node{labels}) {where} SET node.{key} = node.{key} + $by "
+    "RETURN count(node) AS c"
+)
+_DELETE_TMPL = "MATCH (node{labels}) {where} DETACH DELETE node RETURN count(*) AS c"
+_COUNT_TMPL = "MATCH (node{labels}) {where} RETURN count(node) as count"
+_EXISTS_TMPL = "MATCH (node{labels}) {where} RETURN elementId(node) AS id LIMIT 1"
+_AGGREGATE_TMPL = "MATCH (node{labels}) {where} RETURN {aggregations}"
+_SHOW_SCHEMA_NAMES_QUERY = "SHOW INDEXES YIELD name RETURN collect(name) AS names"
+_BULK_CREATE_TMPL = """
+        UNWIND $props_list as props
+        CREATE (node{labels})
+        SET node = props
+        RETURN node.uid as uid, elementId(node) as internal_id
+        """
+
+# Typy temporalne sterownika neo4j, które konwertujemy na typy natywne Pythona
+_TEMPORAL_TYPES = (
+    neo4j.time.DateTime,
+    neo4j.time.Date,
+    neo4j.time.Time,
+    neo4j.time.Duration,
+)
+_TEMPORAL_TYPE_SET = frozenset(_TEMPORAL_TYPES)
+# Najczęstsze typy liści - dla nich pomijamy kosztowniejszy isinstance()
+_PRIMITIVE_TYPE_SET = frozenset({str, int, float, bool, type(None)})
+
+
+def _convert_leaf(value: Any) -> Any:
+    """
+    Konwertuje pojedynczą wartość właściwości (lub tablicę właściwości)
+    z typu temporalnego sterownika neo4j na typ natywny Pythona.
+    """
+    value_type = type(value)
+    if value_type in _PRIMITIVE_TYPE_SET:
+        return value
+    if value_type in _TEMPORAL_TYPE_SET:
+        return value.to_native()
+    if value_type is list:
+        # Właściwości w Neo4j mogą być jednorodnymi tablicami. Nową listę
+        # budujemy tylko wtedy, gdy faktycznie coś zostało skonwertowane.
+        converted = None
+        for index, item in enumerate(value):
+            new_item = _convert_leaf(item)
+            if new_item is not item:
+                if converted is None:
+                    converted = value[:index]
+                converted.append(new_item)
+            elif converted is not None:
+                converted.append(item)
+        return value if converted is None else converted
+    if isinstance(value, _TEMPORAL_TYPES):
+        return value.to_native()
+    return value
+
+
+def _convert_properties(props: dict) -> dict:
+    """
+    Konwertuje (w miejscu) wartości właściwości węzła zwróconego przez
+    sterownik. Słownik pochodzi z odpowiedzi sterownika, więc należy do nas.
+    """
+    for key, value in props.items():
+        if type(value) not in _PRIMITIVE_TYPE_SET:
+            # Podmiana wartości istniejącego klucza jest bezpieczna w trakcie iteracji
+            props[key] = _convert_leaf(value)
+    return props
+
+
 def _convert_neo4j_temporals(obj: Any) -> Any:
     """
-    Rekurencyjnie przechodzi przez obiekt (słownik/listę) i konwertuje
-    specyficzne dla sterownika neo4j typy temporalne (DateTime, Date, etc.)
-    na natywne typy Pythona.
+    Przechodzi przez obiekt (słownik/listę) i konwertuje specyficzne dla
+    sterownika neo4j typy temporalne (DateTime, Date, etc.) na natywne typy
+    Pythona.
+
+    Kontenery są modyfikowane w miejscu (dane pochodzą z odpowiedzi sterownika,
+    więc należą do nas), a przejście jest iteracyjne - bez rekurencji.
     """
-    if isinstance(obj, dict):
-        return {k: _convert_neo4j_temporals(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_convert_neo4j_temporals(v) for v in obj]
-    if isinstance(
-        obj,
-        (
-            neo4j.time.DateTime,
-            neo4j.time.Date,
-            neo4j.time.Time,
-            neo4j.time.Duration,
-        ),
-    ):
-        return obj.to_native()
+    if not isinstance(obj, (dict, list)):
+        return obj.to_native() if isinstance(obj, _TEMPORAL_TYPES) else obj
+
+    stack = [obj]
+    while stack:
+        container = stack.pop()
+        items = container.items() if isinstance(container, dict) else enumerate(container)
+        for key, value in items:
+            value_type = type(value)
+            if value_type in _PRIMITIVE_TYPE_SET:
+                continue
+            if value_type is dict or value_type is list:
+                stack.append(value)
+            elif value_type in _TEMPORAL_TYPE_SET:
+                # Podmiana wartości istniejącego klucza jest bezpieczna w trakcie iteracji
+                container[key] = value.to_native()
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+            elif isinstance(value, _TEMPORAL_TYPES):
+                container[key] = value.to_native()
     return obj
+
+
+# Kontenery mogą być zmienione w miejscu (np. append w haku), więc przy
+# wykrywaniu zmienionych pól zawsze traktujemy je jako zmienione
+_MUTABLE_CONTAINER_TYPES = (list, dict, set)
+
+# Typy, które sterownik neo4j przyjmuje bezpośrednio jako wartości właściwości
+_NATIVE_WRITE_TYPE_SET = frozenset(
+    {
+        str,
+        int,
+        float,
+        bool,
+        type(None),
+        datetime.datetime,
+        datetime.date,
+        datetime.time,
+        datetime.timedelta,
+    }
+)
+
+
+def _to_neo4j_value(value: Any) -> Any:
+    """
+    Przygotowuje wartość z `model_dump(mode="python")` do przekazania
+    sterownikowi. Typy natywne przechodzą bez zmian, UUID zamieniamy na
+    tekst, a pozostałe (np. Enum) serializujemy jak w trybie JSON.
+    """
+    value_type = type(value)
+    if value_type in _NATIVE_WRITE_TYPE_SET:
+        return value
+    if value_type is uuid.UUID:
+        return str(value)
+    if value_type is list or value_type is tuple:
+        return [_to_neo4j_value(v) for v in value]
+    return to_jsonable_python(value)
 # +++ KONIEC NOWEJ FUNKCJI +++
 
 
@@ -51,7 +194,101 @@ class NodeManager:
         self.model = node_model
         # ### ZMIANA ###: Dodajemy kontekst loggera specyficzny dla modelu
         self.log = log.getChild(self.model.__name__)
+        # Fragment `:A:B` i zbiór relacji są wyliczane raz, przez metaklasę
+        self._labels_suffix = self.model._labels_cypher
+        # Pola zapisywane do bazy (bez relacji) - stałe dla modelu
+        self._writable_fields = set(self.model.model_fields) - self.model._dump_exclude
+        self._updatable_fields = self._writable_fields - {"uid"}
+        # Wyniki _overrides_hooks, np. {("pre_save", "post_save"): False}
+        self._hook_overrides: dict[tuple[str, ...], bool] = {}
+
+    @functools.cached_property
+    def _indexed_fields(self) -> frozenset[str]:
+        """Pola z indeksem lub ograniczeniem jednopolowym (po apply_schema)."""
+        meta = self.model._meta
+        single_constraints = {c[0] for c in meta.get("constraints", []) if len(c) == 1}
+        return frozenset({"uid", *meta.get("indexes", []), *single_constraints})
 
+    @functools.cached_property
+    def _list_adapter(self) -> TypeAdapter:
+        """
+        Walidator listy instancji modelu - cała partia jest walidowana jednym
+        wywołaniem. Budowany leniwie, bo manager powstaje razem z klasą modelu,
+        zanim ewentualne referencje w przód zostaną rozwiązane.
+        """
+        return TypeAdapter(list[self.model])
+
+    def _dump_for_write(self, instance: "Node", fields: set[str]) -> dict:
+        """
+        Zrzuca wskazane pola instancji do słownika parametrów zapytania.
+        Używamy trybu "python" (sterownik sam koduje typy natywne, w tym
+        datetime), a jedynie nieobsługiwane typy konwertujemy ręcznie.
+        """
+        dumped = instance.model_dump(mode="python", include=fields)
+        return {key: _to_neo4j_value(value) for key, value in dumped.items()}
+
+    def _dump_changed(
+        self, instance: "Node", before: dict, fields: set[str], always: Iterable[str]
+    ) -> dict:
+        """
+        Jak `_dump_for_write`, ale serializuje tylko pola zmienione od
+        migawki `before` (kopii `instance.__dict__` sprzed aktualizacji i
+        haków) oraz pola z `always`. Pozostałe pola są już w bazie.
+        """
+        current = instance.__dict__
+        changed = {key for key in always if key in fields}
+        for key in fields:
+            value = current.get(key)
+            if value is not before.get(key) or isinstance(value, _MUTABLE_CONTAINER_TYPES):
+                changed.add(key)
+        return self._dump_for_write(instance, changed)
+
+
+    def _overrides_hooks(self, *hook_names: str) -> bool:
+        """
+        Sprawdza, czy model nadpisuje którykolwiek z podanych haków cyklu życia.
+        Jeśli nie, operacje mogą pominąć pobieranie węzłów i wykonać się
+        jednym zapytaniem po stronie bazy. Wynik jest stały dla klasy modelu,
+        więc zapamiętujemy go per zestaw haków.
+        """
+        cached = self._hook_overrides.get(hook_names)
+        if cached is not None:
+            return cached
+
+        from .nodes import Node
+
+        overrides = any(
+            getattr(self.model, name) is not getattr(Node, name) for name in hook_names
+        )
+        self._hook_overrides[hook_names] = overrides
+        return overrides
+
+    async def _run_hooks(self, hooks: Iterable[Awaitable[None]]) -> None:
+        """
+        Uruchamia haki wielu instancji współbieżnie (operacje bulk), z limitem
+        `settings.bulk_hook_concurrency` (0 = bez limitu). Haki muszą więc być
+        bezpieczne przy współbieżnym wykonaniu.
+
+        Wewnątrz jawnej transakcji lub współdzielonej sesji haki wykonujemy
+        sekwencyjnie - sterownik nie obsługuje w nich współbieżnych zapytań.
+        """
+        if _current_transaction.get() is not None or _current_session.get() is not None:
+            for hook in hooks:
+                await hook
+            return
+
+        limit = settings.bulk_hook_concurrency
+        if limit <= 0:
+            await asyncio.gather(*hooks)
+            return
+
+        semaphore = asyncio.Semaphore(limit)
+
+        async def guarded(hook: Awaitable[None]) -> None:
+            async with semaphore:
+                await hook
+
+        await asyncio.gather(*(guarded(hook) for hook in hooks))
 
     def _hydrate_node(self, record: dict) -> "Node":
         if "node" not in record or "internal_id" not in record:
@@ -62,41 +299,99 @@ class NodeManager:
             raise ValueError(
                 "Rekord z bazy danych ma nieprawidłową strukturę do hydratacji."
             )
-        hydrated_node = self.model.model_validate(record["node"])
+        hydrated_node = self.model.model_validate(_convert_properties(record["node"]))
         hydrated_node._internal_id = record["internal_id"]
         return hydrated_node
 
     async def apply_schema(self, *, tx: "AsyncTransaction" | None = None) -> None:
         """
         Czyta opcje `indexes` i `constraints` z klasy Meta modelu i tworzy
-        odpowiednie struktury w bazie danych Neo4j.
+        odpowiednie struktury w bazie danych Neo4j. Pole `uid`, po którym
+        biblioteka domyślnie dopasowuje węzły (m.in. w bulk_update), zawsze
+        dostaje ograniczenie unikalności (a więc i indeks).
         Operacja jest idempotentna (używa CREATE ... IF NOT EXISTS).
         """
+        if connection.database is None:
+            self.log.warning(
+                "NODE4J_DATABASE is not set; every session will resolve the "
+                "default database with an extra round trip."
+            )
+
+        schema_queries = self._schema_queries
+        if not schema_queries:
+            self.log.info("No schema (indexes/constraints) defined for model.")
+            return
+
+        # Polecenia dla struktur, które już istnieją, są pomijane - na
+        # rozgrzanej bazie apply_schema kończy się jednym zapytaniem SHOW.
+        # Indeksy tworzące ograniczenia mają tę samą nazwę co ograniczenie,
+        # więc SHOW INDEXES wystarcza dla obu rodzajów struktur.
+        active_tx = tx or _current_transaction.get()
+        result = await connection.run(_SHOW_SCHEMA_NAMES_QUERY, tx=active_tx)
+        existing = set(result[0]["names"]) if result else set()
+        queries = [
+            query for name, query in schema_queries.items() if name not in existing
+        ]
+        if not queries:
+            self.log.info("Schema for model is already up to date.")
+            return
+
+        self.log.info("Applying schema for model...")
+        # Wszystkie polecenia DDL wykonujemy w jednej transakcji, aby nie płacić
+        # za begin/commit przy każdym z nich. Transakcja sterownika nie obsługuje
+        # współbieżnych zapytań, więc wykonujemy je sekwencyjnie.
+        if active_tx:
+            await self._run_schema_queries(queries, active_tx)
+        else:
+            async with connection.transaction() as new_tx:
+                await self._run_schema_queries(queries, new_tx)
+        self.log.info("Schema applied successfully.")
+
+    @functools.cached_property
+    def _field_adapters(self) -> dict[str, TypeAdapter]:
+        """
+        Walidatory pojedynczych pól modyfikowalnych (z ograniczeniami `Field`).
+        Pozwalają sprawdzić dane aktualizacji bez budowania instancji modelu.
+        """
+        return {
+            name: TypeAdapter(Annotated[info.annotation, info])
+            for name, info in self.model.model_fields.items()
+            if name in self._updatable_fields
+        }
+
+    @functools.cached_property
+    def _schema_queries(self) -> dict[str, str]:
+        """
+        Polecenia DDL wynikające z opcji Meta modelu, kluczowane nazwą
+        indeksu/ograniczenia. Zależą tylko od definicji klasy, więc są
+        budowane raz.
+        """
         label = self.model.__name__
         meta = self.model._meta
-        queries = []
+        queries = {}
+
+        constraints = list(meta.get("constraints", []))
+        if ("uid",) not in [tuple(c) for c in constraints]:
+            constraints.insert(0, ("uid",))
 
         for prop_name in meta.get("indexes", []):
             index_name = f"index_{label}_{prop_name}"
-            query = f"CREATE INDEX {index_name} IF NOT EXISTS FOR (n:`{label}`) ON (n.`{prop_name}`)"
-            queries.append(query)
+            queries[index_name] = f"CREATE INDEX {index_name} IF NOT EXISTS FOR (n:`{label}`) ON (n.`{prop_name}`)"
 
-        for prop_tuple in meta.get("constraints", []):
+        for prop_tuple in constraints:
             prop_names = [f"`{p}`" for p in prop_tuple]
             constraint_name = f"constraint_{label}_{'_'.join(prop_tuple)}"
             prop_cypher = ", ".join([f"n.{p}" for p in prop_names])
-            query = f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS FOR (n:`{label}`) REQUIRE ({prop_cypher}) IS UNIQUE"
-            queries.append(query)
-
-        if not queries:
-            self.log.info(f"No schema (indexes/constraints) defined for model.")
-            return
-
-        self.log.info(f"Applying schema for model...")
+            queries[constraint_name] = f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS FOR (n:`{label}`) REQUIRE ({prop_cypher}) IS UNIQUE"
+        return queries
+
+    async def _run_schema_queries(
+        self, queries: list[str], tx: "AsyncTransaction"
+    ) -> None:
+        # Treść każdego polecenia loguje connection.run - tutaj tylko ich liczba
+        self.log.debug("Executing %s schema queries.", len(queries))
         for query in queries:
-            self.log.debug("Executing schema query", extra={"schema_query": query})
             await connection.run(query, tx=tx)
-        self.log.info(f"Schema applied successfully.")
 
     async def create(self, **kwargs: Any) -> "Node":
         # ### ZMIANA ###: Logowanie operacji
@@ -105,37 +400,30 @@ class NodeManager:
         node_instance = self.model.model_validate(kwargs)
 
         # --- Wywołanie hooka pre_save ---
-        await node_instance.pre_save(is_creating=True)
+        # Niepodpięte (domyślne, puste) haki pomijamy bez tworzenia korutyny
+        if self._overrides_hooks("pre_save"):
+            await node_instance.pre_save(is_creating=True)
 
-        params = node_instance.model_dump(
-            mode="json", exclude=self.model._relationships.keys()
-        )
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
-        set_clauses = [f"{node_alias}.{key}=${key}" for key in params.keys()]
-        set_statement = "SET " + ", ".join(set_clauses) if set_clauses else ""
-        query = (
-            f"CREATE ({node_alias}{labels}) {set_statement} "
-            f"RETURN {node_alias}, elementId({node_alias}) as internal_id"
-        )
+        params = self._dump_for_write(node_instance, self._writable_fields)
+        query = _create_query(self._labels_suffix, tuple(params))
         result = await connection.run(query, params)
         if not result:
             self.log.error("Node creation failed in database, no result returned.")
             raise RuntimeError("Node creation failed in database, no result returned.")
 
-        # Nawadniamy instancję z bazy, żeby mieć _internal_id
-        hydrated_instance = self._hydrate_node(result[0])
-        # Przenosimy stan z oryginalnej instancji, jeśli zaszły zmiany w pre_save
-        for field in node_instance.model_fields_set:
-            setattr(hydrated_instance, field, getattr(node_instance, field))
+        # Węzeł w bazie zawiera dokładnie zwalidowane dane instancji, więc nie
+        # walidujemy ich ponownie - potrzebujemy z bazy tylko _internal_id
+        hydrated_instance = node_instance
+        hydrated_instance._internal_id = result[0]["internal_id"]
 
         # --- Wywołanie hooka post_save ---
-        await hydrated_instance.post_save(is_creating=True)
+        if self._overrides_hooks("post_save"):
+            await hydrated_instance.post_save(is_creating=True)
 
         # ### ZMIANA ###: Logowanie sukcesu
         self.log.info(
             "Node created successfully.",
-            extra={"node_uid": str(hydrated_instance.uid)},
+            extra={"node_uid": hydrated_instance.uid_str},
         )
 
         return hydrated_instance
@@ -146,14 +434,15 @@ class NodeManager:
         if not filters:
             raise ValueError("Metoda match_one wymaga podania filtrów.")
 
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
-        where_clause, params = self._where_statement(node_alias, filters)
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
 
-        builder = ReturnQueryBuilder(node_alias, self.model, prefetch)
-        return_clause = builder.build()
+        return_clause = _build_return_clause(
+            _NODE_ALIAS, self.model, _freeze_prefetch(prefetch)
+        )
 
-        query = f"MATCH ({node_alias}{labels}) {where_clause} {return_clause} LIMIT 1"
+        query = _MATCH_ONE_TMPL.format_map(
+            {"labels": self._labels_suffix, "where": where_clause, "ret": return_clause}
+        )
         result = await connection.run(query, params)
         if not result:
             # ### ZMIANA ###: Logowanie, gdy nic nie znaleziono
@@ -168,29 +457,151 @@ class NodeManager:
         prefetch: list[str] | None = None,
         order_by: list[str] | None = None,
     ) -> list["Node"]:
-        filters = filters or {}
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
-        where_clause, params = self._where_statement(node_alias, filters)
+        query, params = self._match_all_query(filters, prefetch, order_by)
+        nodes: list["Node"] = []
+        received: asyncio.Queue = asyncio.Queue()
+
+        async def receive() -> None:
+            async for record in connection.stream(query, params):
+                received.put_nowait(record["node"])
+            received.put_nowait(_END_OF_STREAM)
+
+        # Odbiór rekordów działa w osobnym zadaniu: gdy czeka ono na kolejną
+        # paczkę z sieci, pętla nawadnia rekordy, które już nadeszły.
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                task_group.create_task(receive())
+                while (node_data := await received.get()) is not _END_OF_STREAM:
+                    nodes.append(self._hydrate_prefetched(node_data))
+        except ExceptionGroup as group:
+            # Wywołujący oczekuje pierwotnego wyjątku (np. błędu sterownika),
+            # a nie grupy z TaskGroup
+            raise group.exceptions[0] from None
+
+        # ### ZMIANA ###: Logowanie liczby znalezionych obiektów
+        self.log.debug("match_all found %s nodes.", len(nodes))
 
-        builder = ReturnQueryBuilder(node_alias, self.model, prefetch)
-        return_clause = builder.build()
+        return nodes
 
-        orderby_clause = (
-            self._orderby_statement(node_alias, order_by) if order_by else ""
+    async def values_list(
+        self,
+        *fields: str,
+        filters: dict | Q | None = None,
+        order_by: list[str] | None = None,
+        flat: bool = False,
+    ) -> list:
+        """
+        Zwraca same wartości wskazanych pól zamiast pełnych węzłów - zapytanie
+        zwraca tylko te właściwości, więc nie ma hydratacji modeli pydantic.
+
+        :param flat: Dla jednego pola zwraca płaską listę wartości zamiast
+                     listy jednoelementowych krotek.
+        :return: Lista krotek wartości w kolejności `fields` (lub wartości, gdy `flat`).
+        """
+        if not fields:
+            raise ValueError("Metoda values_list wymaga podania co najmniej jednego pola.")
+        if flat and len(fields) > 1:
+            raise ValueError("Parametr flat wymaga dokładnie jednego pola.")
+
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters or {})
+        query = _VALUES_TMPL.format_map(
+            {
+                "labels": self._labels_suffix,
+                "where": where_clause,
+                "columns": _values_columns(_NODE_ALIAS, fields),
+                "order": self._orderby_statement(_NODE_ALIAS, order_by) if order_by else "",
+            }
         )
+        result = await connection.run(query, params)
+        if flat:
+            return [_convert_leaf(row["v0"]) for row in result]
+        return [
+            tuple(_convert_leaf(value) for value in row.values()) for row in result
+        ]
 
-        query = (
-            f"MATCH ({node_alias}{labels}) {where_clause} "
-            f"{return_clause} "
-            f"{orderby_clause}"
+    async def match_in(
+        self,
+        field: str,
+        values: Iterable[Any],
+        filters: dict | Q | None = None,
+        prefetch: list[str] | None = None,
+    ) -> list["Node"]:
+        """
+        Pobiera węzły, których pole `field` ma jedną z wartości `values`.
+        Odpowiednik `match_all({f"{field}__in": values})` dla długich list:
+        zapytanie ma postać `UNWIND $values ... MATCH (node {field: value})`,
+        więc każda wartość jest osobnym wyszukaniem w indeksie pola.
+        Duplikaty w `values` są pomijane; kolejność wyniku nie jest określona.
+
+        :param filters: Dodatkowe filtry (jak w `match_all`).
+        """
+        _validate_identifier(field, "nazwa pola")
+        unique_values = list(dict.fromkeys(map(_to_neo4j_value, values)))
+        if not unique_values:
+            return []
+
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters or {})
+        params["values"] = unique_values
+        return_clause = _build_return_clause(
+            _NODE_ALIAS, self.model, _freeze_prefetch(prefetch)
         )
-        result_set = await connection.run(query, params)
 
-        # ### ZMIANA ###: Logowanie liczby znalezionych obiektów
-        self.log.debug(f"match_all found {len(result_set)} nodes.")
+        query = _MATCH_IN_TMPL.format_map(
+            {
+                "labels": self._labels_suffix,
+                "key": f"`{field}`",
+                "where": where_clause,
+                "ret": return_clause,
+            }
+        )
+        result = await connection.run(query, params)
+        self.log.debug("match_in found %s nodes.", len(result))
+        return [self._hydrate_prefetched(record["node"]) for record in result]
 
-        return [self._hydrate_prefetched(record["node"]) for record in result_set]
+    async def iter_all(
+        self,
+        filters: dict | Q | None = None,
+        prefetch: list[str] | None = None,
+        order_by: list[str] | None = None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator["Node"]:
+        """
+        Jak `match_all`, ale zwraca węzły pojedynczo, w miarę napływania
+        rekordów z bazy - bez buforowania całego wyniku w pamięci.
+
+        :param batch_size: Liczba rekordów pobieranych z serwera w jednej
+                           paczce (`fetch_size` sesji sterownika).
+        """
+        query, params = self._match_all_query(filters, prefetch, order_by)
+        async for record in connection.stream(query, params, fetch_size=batch_size):
+            yield self._hydrate_prefetched(record["node"])
+
+    def _match_all_query(
+        self,
+        filters: dict | Q | None,
+        prefetch: list[str] | None,
+        order_by: list[str] | None,
+    ) -> tuple[str, dict]:
+        filters = filters or {}
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
+
+        return_clause = _build_return_clause(
+            _NODE_ALIAS, self.model, _freeze_prefetch(prefetch)
+        )
+
+        orderby_clause = (
+            self._orderby_statement(_NODE_ALIAS, order_by) if order_by else ""
+        )
+
+        query = _MATCH_ALL_TMPL.format_map(
+            {
+                "labels": self._labels_suffix,
+                "where": where_clause,
+                "ret": return_clause,
+                "order": orderby_clause,
+            }
+        )
+        return query, params
 
     async def update(self, filters: dict | Q, data: dict) -> int:
         if not filters:
@@ -204,12 +615,15 @@ class NodeManager:
             "Update operation started.", extra={"filters": filters, "update_data": data}
         )
 
+        if not self._overrides_hooks("pre_save", "post_save"):
+            return await self._update_without_hooks(filters, data)
+
         nodes_to_update = await self.match_all(filters=filters)
         if not nodes_to_update:
             self.log.info("Update operation found no nodes to update.")
             return 0
 
-        self.log.info(f"Found {len(nodes_to_update)} nodes to update.")
+        self.log.info("Found %s nodes to update.", len(nodes_to_update))
 
         active_tx = _current_transaction.get()
         if active_tx:
@@ -219,35 +633,159 @@ class NodeManager:
                 updated_count = await self._perform_update(nodes_to_update, data, tx)
         
         # ### ZMIANA ###: Logowanie wyniku
-        self.log.info(f"Successfully updated {updated_count} nodes.")
+        self.log.info("Successfully updated %s nodes.", updated_count)
+        return updated_count
+
+    async def update_returning(self, filters: dict | Q, data: dict) -> list["Node"]:
+        """
+        Jak `update`, ale zwraca zaktualizowane węzły zamiast ich liczby - bez
+        osobnego `match_one`/`match_all` po zapisie. Modele bez haków dostają
+        węzły z klauzuli RETURN zapytania aktualizującego; w modelach z hakami
+        węzły i tak są pobierane przed zapisem, więc zwracamy te instancje.
+        """
+        if not filters:
+            raise ValueError("Metoda update_returning wymaga podania filtrów...")
+
+        if self._overrides_hooks("pre_save", "post_save"):
+            nodes = await self.match_all(filters=filters)
+            if nodes and data:
+                active_tx = _current_transaction.get()
+                if active_tx:
+                    await self._perform_update(nodes, data, active_tx)
+                else:
+                    async with connection.transaction() as tx:
+                        await self._perform_update(nodes, data, tx)
+            return nodes
+
+        where_clause, params = self._update_params(filters, data)
+        query = _UPDATE_RETURNING_TMPL.format_map(
+            {
+                "labels": self._labels_suffix,
+                "where": where_clause,
+                "ret": _build_return_clause(_NODE_ALIAS, self.model, ()),
+            }
+        )
+        result = await connection.run(query, params)
+        self.log.info("Successfully updated %s nodes.", len(result))
+        return [self._hydrate_prefetched(record["node"]) for record in result]
+
+    async def increment(self, filters: dict | Q, field: str, by: int | float = 1) -> int:
+        """
+        Zwiększa pole liczbowe o `by` po stronie bazy, jednym zapytaniem -
+        bez pobierania węzłów i zapisu ich z powrotem (np. przez bulk_update).
+        Podobnie jak zapis MATCH ... SET, nie wywołuje haków pre_save/post_save.
+
+        :return: Liczba zaktualizowanych węzłów.
+        """
+        if not filters:
+            raise ValueError("Metoda increment wymaga podania filtrów...")
+        _validate_identifier(field, "nazwa pola")
+
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
+        params["by"] = by
+        query = _INCREMENT_TMPL.format_map(
+            {"labels": self._labels_suffix, "where": where_clause, "key": f"`{field}`"}
+        )
+        result = await connection.run(query, params)
+        updated_count = result[0]["c"] if result else 0
+        self.log.info("Incremented '%s' on %s nodes.", field, updated_count)
+        return updated_count
+
+    def _update_params(self, filters: dict | Q, data: dict) -> tuple[str, dict]:
+        """
+        Klauzula WHERE i parametry (z `$data`) zapytań MATCH ... SET. Ta ścieżka
+        nie buduje instancji modelu, więc pola i wartości sprawdzamy tutaj.
+
+        :raises ValueError: Gdy `data` zawiera pole spoza pól modyfikowalnych.
+        :raises pydantic.ValidationError: Gdy wartość nie pasuje do typu pola.
+        """
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
+        params["data"] = self._validated_update_data(data)
+        return where_clause, params
+
+    def _validated_update_data(self, data: dict, match_on: str | None = None) -> dict:
+        """
+        Sprawdza pola i wartości aktualizacji wykonywanej bez instancji modelu
+        i serializuje je tak samo jak _dump_for_write w ścieżce z hakami.
+        Pole `match_on` (bulk_update) jest tylko kluczem dopasowania - musi
+        być obecne, a jego wartość nie jest walidowana jako pole modyfikowalne.
+        """
+        unknown = data.keys() - self._updatable_fields - {match_on}
+        if unknown:
+            raise ValueError(
+                f"Pola {sorted(unknown)} nie istnieją w modelu "
+                f"'{self.model.__name__}' lub nie mogą być aktualizowane."
+            )
+        adapters = self._field_adapters
+        validated = {
+            k: _to_neo4j_value(adapters[k].validate_python(v))
+            for k, v in data.items()
+            if k != match_on
+        }
+        if match_on is not None:
+            # Jak w ścieżce z hakami (`item[match_on]`) - brak klucza to KeyError
+            validated[match_on] = _to_neo4j_value(data[match_on])
+        return validated
+
+    async def _update_without_hooks(self, filters: dict | Q, data: dict) -> int:
+        """
+        Szybka ścieżka dla modeli bez haków: jedno zapytanie MATCH ... SET,
+        bez pobierania i hydratacji węzłów.
+        """
+        where_clause, params = self._update_params(filters, data)
+        query = _UPDATE_TMPL.format_map(
+            {"labels": self._labels_suffix, "where": where_clause}
+        )
+        result = await connection.run(query, params)
+        updated_count = result[0]["c"] if result else 0
+
+        self.log.info("Successfully updated %s nodes.", updated_count)
         return updated_count
 
     async def _perform_update(
         self, nodes: list["Node"], data: dict, tx: "AsyncTransaction"
     ) -> int:
-        """Wewnętrzna metoda wykonująca logikę aktualizacji w ramach danej transakcji."""
-        updated_count = 0
+        """
+        Wewnętrzna metoda wykonująca logikę aktualizacji w ramach danej transakcji.
+        Wszystkie węzły są zapisywane jednym zapytaniem UNWIND.
+        """
+        rows = []
+        debug_enabled = self.log.isEnabledFor(logging.DEBUG)
+        # Ta ścieżka wymaga co najmniej jednego haka - pozostałe możemy pominąć
+        run_pre_save = self._overrides_hooks("pre_save")
         for node_instance in nodes:
-            self.log.debug("Updating node", extra={"node_uid": str(node_instance.uid)})
+            if debug_enabled:
+                self.log.debug("Updating node", extra={"node_uid": node_instance.uid_str})
+            # Zapisujemy tylko pola zmienione przez `data` lub przez hak pre_save
+            before = dict(node_instance.__dict__)
             for key, value in data.items():
                 setattr(node_instance, key, value)
 
-            await node_instance.pre_save(is_creating=False)
+            if run_pre_save:
+                await node_instance.pre_save(is_creating=False)
 
-            update_params = node_instance.model_dump(
-                mode="json", exclude={"uid", *self.model._relationships.keys()}
-            )
-            query = "MATCH (node) WHERE elementId(node) = $element_id SET node += $data"
-            await connection.run(
-                query,
-                {"element_id": node_instance._internal_id, "data": update_params},
-                tx=tx,
+            rows.append(
+                {
+                    "element_id": node_instance._internal_id,
+                    "data": self._dump_changed(
+                        node_instance, before, self._updatable_fields, data
+                    ),
+                }
             )
 
-            await node_instance.post_save(is_creating=False)
-            updated_count += 1
+        query = (
+            "UNWIND $rows AS r "
+            "MATCH (node) WHERE elementId(node) = r.element_id "
+            "SET node += r.data "
+            "RETURN count(node) AS c"
+        )
+        result = await connection.run(query, {"rows": rows}, tx=tx)
+        updated_count = result[0]["c"] if result else 0
+
+        if self._overrides_hooks("post_save"):
+            for node_instance in nodes:
+                await node_instance.post_save(is_creating=False)
         return updated_count
-        # +++ KONIEC POPRAWKI +++
 
     async def delete(self, filters: dict | Q) -> int:
         if not filters:
@@ -255,12 +793,15 @@ class NodeManager:
 
         self.log.debug("Delete operation started.", extra={"filters": filters})
 
+        if not self._overrides_hooks("pre_delete", "post_delete"):
+            return await self._delete_without_hooks(filters)
+
         nodes_to_delete = await self.match_all(filters=filters)
         if not nodes_to_delete:
             self.log.info("Delete operation found no nodes to delete.")
             return 0
             
-        self.log.info(f"Found {len(nodes_to_delete)} nodes to delete.")
+        self.log.info("Found %s nodes to delete.", len(nodes_to_delete))
 
         active_tx = _current_transaction.get()
         if active_tx:
@@ -269,32 +810,61 @@ class NodeManager:
             async with connection.transaction() as tx:
                 deleted_count = await self._perform_delete(nodes_to_delete, tx)
         
-        self.log.info(f"Successfully deleted {deleted_count} nodes.")
+        self.log.info("Successfully deleted %s nodes.", deleted_count)
+        return deleted_count
+
+    async def _delete_without_hooks(self, filters: dict | Q) -> int:
+        """Szybka ścieżka dla modeli bez haków: jedno zapytanie MATCH ... DETACH DELETE."""
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
+
+        query = _DELETE_TMPL.format_map(
+            {"labels": self._labels_suffix, "where": where_clause}
+        )
+        result = await connection.run(query, params)
+        deleted_count = result[0]["c"] if result else 0
+
+        self.log.info("Successfully deleted %s nodes.", deleted_count)
         return deleted_count
 
     async def _perform_delete(self, nodes: list["Node"], tx: "AsyncTransaction") -> int:
-        deleted_count = 0
+        """Usuwa wszystkie węzły jednym zapytaniem UNWIND w ramach danej transakcji."""
+        element_ids = []
+        debug_enabled = self.log.isEnabledFor(logging.DEBUG)
+        run_pre_delete = self._overrides_hooks("pre_delete")
         for node_instance in nodes:
-            self.log.debug("Deleting node", extra={"node_uid": str(node_instance.uid)})
-            await node_instance.pre_delete()
-            query = (
-                "MATCH (node) WHERE elementId(node) = $element_id DETACH DELETE node"
-            )
-            await connection.run(
-                query, {"element_id": node_instance._internal_id}, tx=tx
-            )
-            await node_instance.post_delete()
-            deleted_count += 1
+            if debug_enabled:
+                self.log.debug("Deleting node", extra={"node_uid": node_instance.uid_str})
+            if run_pre_delete:
+                await node_instance.pre_delete()
+            element_ids.append(node_instance._internal_id)
+
+        query = (
+            "UNWIND $element_ids AS element_id "
+            "MATCH (node) WHERE elementId(node) = element_id "
+            "DETACH DELETE node "
+            "RETURN count(*) AS c"
+        )
+        result = await connection.run(query, {"element_ids": element_ids}, tx=tx)
+        deleted_count = result[0]["c"] if result else 0
+
+        if self._overrides_hooks("post_delete"):
+            for node_instance in nodes:
+                await node_instance.post_delete()
         return deleted_count
 
     async def get_or_create(
         self, filters: dict, defaults: dict | None = None
     ) -> tuple["Node", bool]:
         self.log.debug("get_or_create operation started.", extra={"filters": filters, "defaults": defaults})
-        
+
+        if self._can_merge(filters):
+            merged = await self._merge(filters, defaults or {}, update_on_match=False)
+            if merged is not None:
+                return merged
+
         found_node = await self.match_one(filters)
         if found_node:
-            self.log.info("get_or_create found an existing node.", extra={"node_uid": str(found_node.uid)})
+            self.log.info("get_or_create found an existing node.", extra={"node_uid": found_node.uid_str})
             return found_node, False
 
         self.log.info("get_or_create did not find a node, creating a new one.")
@@ -309,57 +879,167 @@ class NodeManager:
         self, filters: dict, defaults: dict
     ) -> tuple["Node", bool]:
         self.log.debug("update_or_create operation started.", extra={"filters": filters, "defaults": defaults})
-        
+
+        if self._can_merge(filters):
+            merged = await self._merge(filters, defaults, update_on_match=True)
+            if merged is not None:
+                return merged
+
         found_node = await self.match_one(filters)
 
         if found_node:
-            self.log.info("update_or_create found an existing node, updating it.", extra={"node_uid": str(found_node.uid)})
-            await self.update(filters={"uid": str(found_node.uid)}, data=defaults)
-            updated_node = await self.match_one(filters={"uid": str(found_node.uid)})
-            return updated_node, False
+            self.log.info("update_or_create found an existing node, updating it.", extra={"node_uid": found_node.uid_str})
+            if defaults:
+                await self._update_instance(found_node, defaults)
+            return found_node, False
         else:
             self.log.info("update_or_create did not find a node, creating a new one.")
             create_data = {**filters, **defaults}
             new_node = await self.create(**create_data)
             return new_node, True
 
+    async def _update_instance(self, node: "Node", data: dict) -> None:
+        """
+        Aktualizuje już pobraną instancję w bazie i w pamięci, bez ponownego
+        wyszukiwania i odczytu węzła po zapisie.
+        """
+        if not self._overrides_hooks("pre_save", "post_save"):
+            await self._update_without_hooks({"uid": node.uid_str}, data)
+            for key, value in data.items():
+                setattr(node, key, value)
+            return
+
+        # _perform_update ustawia pola i wywołuje haki na tej samej instancji
+        active_tx = _current_transaction.get()
+        if active_tx:
+            await self._perform_update([node], data, active_tx)
+        else:
+            async with connection.transaction() as tx:
+                await self._perform_update([node], data, tx)
+
+    def _can_merge(self, filters: dict) -> bool:
+        """
+        Czy get_or_create/update_or_create mogą użyć pojedynczego MERGE.
+        Wymaga filtrów równościowych na zwykłych polach (bez lookupów typu
+        `__gt`) oraz modelu bez haków pre_save/post_save, które muszą zostać
+        wywołane przed zapisem, gdy już wiadomo, czy węzeł jest tworzony.
+        Wartość None w filtrach też wyklucza MERGE - Neo4j odrzuca wzorzec
+        `{pole: null}`, a ścieżka match + create obsługuje go poprawnie.
+        """
+        return (
+            isinstance(filters, dict)
+            and bool(filters)
+            and all(
+                key in self._writable_fields and value is not None
+                for key, value in filters.items()
+            )
+            and not self._overrides_hooks("pre_save", "post_save")
+        )
+
+    async def _merge(
+        self, filters: dict, defaults: dict, *, update_on_match: bool
+    ) -> tuple["Node", bool] | None:
+        """
+        Wyszukuje lub tworzy węzeł jednym zapytaniem MERGE (jedna podróż do
+        bazy zamiast 2-3). Pełną unikalność przy współbieżnych zapisach
+        gwarantuje dopiero ograniczenie UNIQUE na polach z `filters`.
+
+        Zwraca None, jeśli dane nie tworzą poprawnej instancji modelu -
+        wtedy wywołujący wraca do ścieżki match_one + create.
+        """
+        try:
+            instance = self.model.model_validate({**filters, **defaults})
+        except ValidationError:
+            return None
+
+        create_props = self._dump_for_write(instance, self._writable_fields)
+        keys = tuple(filters)
+        # Dopasowujemy po wartościach z filtrów (jak match_one), a nie po
+        # danych tworzonego węzła, które mogą zostać nadpisane przez `defaults`
+        params = {
+            f"match_{i}": _to_neo4j_value(filters[key]) for i, key in enumerate(keys)
+        }
+        params["create_props"] = create_props
+        params["match_props"] = (
+            {
+                key: _to_neo4j_value(value)
+                for key, value in defaults.items()
+                if key in self._updatable_fields
+            }
+            if update_on_match
+            else {}
+        )
+
+        result = await connection.run(_merge_query(self._labels_suffix, keys), params)
+        if not result:
+            raise RuntimeError("Zapytanie MERGE nie zwróciło węzła.")
+
+        node = self._hydrate_node(result[0])
+        created = result[0]["created"]
+        self.log.info(
+            "Node merged.", extra={"node_uid": node.uid_str, "created": created}
+        )
+        return node, created
+
+    async def exists(self, filters: dict | Q | None = None) -> bool:
+        """
+        Sprawdza, czy istnieje co najmniej jeden węzeł spełniający filtry.
+        Tańsze niż `match_one`/`count` - baza kończy po pierwszym dopasowaniu
+        i nie buduje projekcji węzła.
+        """
+        return await self._exists_and_id(filters) is not None
+
+    async def _exists_and_id(self, filters: dict | Q | None = None) -> Optional[str]:
+        """Zwraca elementId pierwszego pasującego węzła lub None."""
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters or {})
+        query = _EXISTS_TMPL.format_map(
+            {"labels": self._labels_suffix, "where": where_clause}
+        )
+        result = await connection.run(query, params)
+        return result[0]["id"] if result else None
+
     async def count(self, filters: dict | Q | None = None) -> int:
         # Logowanie jest w connection.run
         filters = filters or {}
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
-        where_clause, params = self._where_statement(node_alias, filters)
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
 
-        query = (
-            f"MATCH ({node_alias}{labels}) {where_clause} "
-            f"RETURN count({node_alias}) as count"
+        query = _COUNT_TMPL.format_map(
+            {"labels": self._labels_suffix, "where": where_clause}
         )
         result = await connection.run(query, params)
         count = result[0]["count"] if result else 0
-        self.log.debug(f"Count operation returned {count}.")
+        self.log.debug("Count operation returned %s.", count)
         return count
 
 
     async def aggregate(self, filters: dict | None = None, **aggregations: str) -> dict:
+        """
+        Oblicza agregacje w jednym zapytaniu, np.
+        `aggregate(total="count(*)", avg_age="avg(age)")`. Liczność i inne
+        statystyki warto pobierać razem, zamiast osobno przez `count()`.
+        """
         if not aggregations:
             raise ValueError(
                 "Metoda aggregate wymaga podania co najmniej jednej agregacji."
             )
 
         filters = filters or {}
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
-        where_clause, params = self._where_statement(node_alias, filters)
+        where_clause, params = self._where_statement(_NODE_ALIAS, filters)
 
         return_clauses = []
         for key, func in aggregations.items():
-            if f"{node_alias}." not in func:
-                func = func.replace("(", f"({node_alias}.", 1)
+            # `count(*)` nie odnosi się do pola - zostawiamy je bez zmian
+            if "node." not in func and "(*)" not in func:
+                func = func.replace("(", "(node.", 1)
             return_clauses.append(f"{func} as {key}")
 
-        return_statement = "RETURN " + ", ".join(return_clauses)
-
-        query = f"MATCH ({node_alias}{labels}) {where_clause} {return_statement}"
+        query = _AGGREGATE_TMPL.format_map(
+            {
+                "labels": self._labels_suffix,
+                "where": where_clause,
+                "aggregations": ", ".join(return_clauses),
+            }
+        )
 
         self.log.debug("Aggregate operation started.", extra={"aggregations": aggregations})
         result = await connection.run(query, params)
@@ -379,32 +1059,23 @@ class NodeManager:
         if not data:
             return []
 
-        self.log.info(f"Starting bulk_create for {len(data)} nodes.")
+        self.log.info("Starting bulk_create for %s nodes.", len(data))
 
         
-        # Krok 1: Walidacja i wywołanie haków pre_save
-        instances_to_create: list["Node"] = []
-        props_list: list[dict] = []
-        for item_data in data:
-            instance = self.model.model_validate(item_data)
-            await instance.pre_save(is_creating=True)
-            instances_to_create.append(instance)
-            # Upewniamy się, że uid jest stringiem dla JSON
-            props = instance.model_dump(
-                mode="json", exclude=self.model._relationships.keys()
+        # Krok 1: Walidacja (synchronicznie), a następnie współbieżne haki pre_save
+        instances_to_create: list["Node"] = self._list_adapter.validate_python(data)
+        if self._overrides_hooks("pre_save"):
+            await self._run_hooks(
+                instance.pre_save(is_creating=True) for instance in instances_to_create
             )
-            props_list.append(props)
+        # uid jest zamieniany na tekst w _dump_for_write
+        props_list: list[dict] = [
+            self._dump_for_write(instance, self._writable_fields)
+            for instance in instances_to_create
+        ]
 
         # Krok 2: Przygotowanie i wykonanie zapytania UNWIND
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
-
-        query = f"""
-        UNWIND $props_list as props
-        CREATE ({node_alias}{labels})
-        SET {node_alias} = props
-        RETURN {node_alias}, elementId({node_alias}) as internal_id
-        """
+        query = _BULK_CREATE_TMPL.format_map({"labels": self._labels_suffix})
 
         result_set = await connection.run(query, {"props_list": props_list})
         if not result_set:
@@ -412,14 +1083,21 @@ class NodeManager:
             return []
 
 
-        # Krok 3: Hydratacja i wywołanie haków post_save
+        # Krok 3: Przypisanie _internal_id i wywołanie haków post_save. Instancje
+        # są już zwalidowane, a baza zawiera dokładnie ich dane - nie walidujemy
+        # ich ponownie, tylko dopasowujemy identyfikatory po uid.
+        instances_by_uid = {instance.uid_str: instance for instance in instances_to_create}
         created_nodes: list["Node"] = []
         for record in result_set:
-            hydrated_node = self._hydrate_node(record)
-            await hydrated_node.post_save(is_creating=True)
-            created_nodes.append(hydrated_node)
+            instance = instances_by_uid[record["uid"]]
+            instance._internal_id = record["internal_id"]
+            created_nodes.append(instance)
+        if self._overrides_hooks("post_save"):
+            await self._run_hooks(
+                node.post_save(is_creating=True) for node in created_nodes
+            )
 
-        self.log.info(f"Successfully finished bulk_create, created {len(created_nodes)} nodes.")
+        self.log.info("Successfully finished bulk_create, created %s nodes.", len(created_nodes))
         return created_nodes
 
     async def bulk_update(self, data: list[dict], match_on: str = "uid") -> int:
@@ -432,11 +1110,22 @@ class NodeManager:
         :param match_on: Klucz używany do znalezienia węzła do aktualizacji.
         :return: Liczba zaktualizowanych węzłów.
         """
-        self.log.info(f"Starting bulk_update for {len(data)} nodes, matching on '{match_on}'.")
+        self.log.info("Starting bulk_update for %s nodes, matching on '%s'.", len(data), match_on)
         if not data:
             self.log.warning("bulk_update called with empty data, no action taken.")
             return 0
 
+        # Walidujemy od razu, zanim uruchomimy jakiekolwiek haki
+        _validate_identifier(match_on, "pole match_on")
+        if match_on not in self._indexed_fields:
+            self.log.debug(
+                "bulk_update matches on a field without an index; consider adding it to Meta.indexes.",
+                extra={"match_on": match_on},
+            )
+
+        if not self._overrides_hooks("pre_save", "post_save"):
+            return await self._bulk_update_without_hooks(data, match_on)
+
         # Krok 1: Pobranie obiektów i wywołanie haków pre_save
         match_values = [item[match_on] for item in data]
         nodes_to_update = await self.match_all(
@@ -446,61 +1135,86 @@ class NodeManager:
         # Mapowanie uid -> instance dla łatwego dostępu
         node_map = {str(getattr(node, match_on)): node for node in nodes_to_update}
 
-        props_list = []
+        instances_to_update: list["Node"] = []
+        snapshots: list[dict] = []
+        payload_keys: list[Iterable[str]] = []
         for item_data in data:
             match_value = str(item_data.get(match_on))
             instance = node_map.get(match_value)
 
             if not instance:
                 self.log.warning(
-                    f"Node not found for bulk_update.",
+                    "Node not found for bulk_update.",
                     extra={"match_on": match_on, "match_value": match_value}
                 )
                 continue
 
 
-            # Aktualizacja pól na instancji i wywołanie pre_save
+            # Aktualizacja pól na instancji
+            snapshots.append(dict(instance.__dict__))
+            payload_keys.append(item_data.keys())
             update_payload = {k: v for k, v in item_data.items() if k != match_on}
             for key, value in update_payload.items():
                 setattr(instance, key, value)
+            instances_to_update.append(instance)
 
-            await instance.pre_save(is_creating=False)
-
-            # Zbieramy dane do zapytania
-            props_list.append(
-                instance.model_dump(
-                    mode="json", exclude=self.model._relationships.keys()
-                )
+        # Współbieżne haki pre_save, a potem zbieramy dane do zapytania
+        if self._overrides_hooks("pre_save"):
+            await self._run_hooks(
+                instance.pre_save(is_creating=False) for instance in instances_to_update
+            )
+        # Pole match_on jest potrzebne w każdym wierszu do dopasowania węzła
+        props_list = [
+            self._dump_changed(
+                instance, before, self._writable_fields, (match_on, *keys)
             )
+            for instance, before, keys in zip(instances_to_update, snapshots, payload_keys)
+        ]
 
         if not props_list:
             self.log.info("No valid nodes to update after filtering in bulk_update.")
             return 0
 
         # Krok 2: Wykonanie zapytania UNWIND
-        node_alias = "node"
-        labels = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(self.model.labels())
+        result = await self._run_bulk_update(props_list, match_on)
+        updated_count = result[0]["updated_count"] if result else 0
 
-        query = f"""
-        UNWIND $props_list as props
-        MATCH ({node_alias}{labels} {{ {match_on}: props.{match_on} }})
-        SET {node_alias} += props
-        RETURN count({node_alias}) as updated_count
+        # Krok 3: Wywołanie haków post_save
+        if self._overrides_hooks("post_save"):
+            await self._run_hooks(
+                instance.post_save(is_creating=False) for instance in instances_to_update
+            )
+
+        self.log.info("Successfully finished bulk_update, updated %s nodes.", updated_count)
+        return updated_count
+
+    async def _bulk_update_without_hooks(self, data: list[dict], match_on: str) -> int:
+        """
+        Szybka ścieżka bulk_update dla modeli bez haków: pomija odczyt węzłów
+        i wykonuje jedno zapytanie UNWIND bezpośrednio na danych wejściowych
+        (sprawdzonych tak jak w `update`).
         """
+        props_list = [
+            self._validated_update_data(item_data, match_on) for item_data in data
+        ]
 
-        result = await connection.run(query, {"props_list": props_list})
+        result = await self._run_bulk_update(props_list, match_on)
         updated_count = result[0]["updated_count"] if result else 0
 
-        # Krok 3: Wywołanie haków post_save
-        for item_data in data:
-            match_value = str(item_data.get(match_on))
-            instance = node_map.get(match_value)
-            if instance:
-                await instance.post_save(is_creating=False)
-
-        self.log.info(f"Successfully finished bulk_update, updated {updated_count} nodes.")
+        self.log.info("Successfully finished bulk_update, updated %s nodes.", updated_count)
         return updated_count
 
+    async def _run_bulk_update(self, props_list: list[dict], match_on: str) -> list[dict]:
+        """
+        Wykonuje zapytanie UNWIND bulk_update. Warunek bazowy menedżera (np.
+        filtr SoftDeleteManager) dokładamy przez `_where_statement` z pustymi
+        filtrami - szybka ścieżka nie przechodzi przez match_all.
+        """
+        where_clause, params = self._where_statement(_NODE_ALIAS, {})
+        query = _bulk_update_query(self._labels_suffix, match_on, where_clause)
+        params["props_list"] = props_list
+        return await connection.run(query, params)
+
 
     async def connect(
         self,
@@ -509,47 +1223,35 @@ class NodeManager:
         rel_type: str,
         properties: dict | None = None,
     ):
-        # Logowanie jest w connection.run
-        self.log.debug(
-            f"Connecting nodes.",
-            extra={
-                "from_uid": str(from_node_uid),
-                "to_uid": str(to_node_uid),
-                "rel_type": rel_type,
-            }
-        )
-        query = """
-        MATCH (a), (b)
-        WHERE a.uid = $from_uid AND b.uid = $to_uid
-        CREATE (a)-[r:`{rel_type}`]->(b)
-        SET r += $props
-        RETURN r
-        """.format(rel_type=rel_type)
+        query = _connect_query(rel_type)
         params = {
             "from_uid": str(from_node_uid),
             "to_uid": str(to_node_uid),
             "props": properties or {},
         }
+        # Logowanie zapytania jest w connection.run
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Connecting nodes.",
+                extra={
+                    "from_uid": params["from_uid"],
+                    "to_uid": params["to_uid"],
+                    "rel_type": rel_type,
+                }
+            )
         await connection.run(query, params)
 
     async def disconnect(
         self, from_node_uid: uuid.UUID, to_node_uid: uuid.UUID, rel_type: str
     ):
-        # Logowanie jest w connection.run
-        self.log.debug(
-            f"Disconnecting nodes.",
-            extra={
-                "from_uid": str(from_node_uid),
-                "to_uid": str(to_node_uid),
-                "rel_type": rel_type,
-            }
-        )
-        query = """
-        MATCH (a)-[r:`{rel_type}`]->(b)
-        WHERE a.uid = $from_uid AND b.uid = $to_uid
-        DELETE r
-        """.format(rel_type=rel_type)
+        query = _disconnect_query(rel_type)
         params = {"from_uid": str(from_node_uid), "to_uid": str(to_node_uid)}
+        # Logowanie zapytania jest w connection.run
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Disconnecting nodes.",
+                extra={**params, "rel_type": rel_type}
+            )
         await connection.run(query, params)
 
     async def update_relationship(
@@ -562,61 +1264,119 @@ class NodeManager:
         if not properties:
             return
 
-        self.log.debug(
-            f"Updating relationship.",
-            extra={
-                "from_uid": str(from_node_uid),
-                "to_uid": str(to_node_uid),
-                "rel_type": rel_type,
-                "properties": properties,
-            }
-        )
-
-        query = """
-        MATCH (a)-[r:`{rel_type}`]->(b)
-        WHERE a.uid = $from_uid AND b.uid = $to_uid
-        SET r += $props
-        RETURN r
-        """.format(rel_type=rel_type)
+        query = _update_relationship_query(rel_type)
         params = {
             "from_uid": str(from_node_uid),
             "to_uid": str(to_node_uid),
             "props": properties,
         }
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Updating relationship.",
+                extra={
+                    "from_uid": params["from_uid"],
+                    "to_uid": params["to_uid"],
+                    "rel_type": rel_type,
+                    "properties": properties,
+                }
+            )
         await connection.run(query, params)
 
+    async def bulk_connect(
+        self,
+        pairs: list[tuple[uuid.UUID, uuid.UUID, dict | None]],
+        rel_type: str,
+    ) -> int:
+        """
+        Tworzy wiele relacji jednym zapytaniem UNWIND - odpowiednik wywołania
+        `connect` dla każdej pary, ale w jednej podróży do bazy.
+
+        :param pairs: Lista krotek `(from_uid, to_uid, properties)`.
+        :return: Liczba utworzonych relacji.
+        """
+        if not pairs:
+            return 0
+        query = _bulk_connect_query(rel_type)
+        rows = [
+            {"from": str(from_uid), "to": str(to_uid), "props": props or {}}
+            for from_uid, to_uid, props in pairs
+        ]
+        self.log.debug("Connecting %s node pairs.", len(rows), extra={"rel_type": rel_type})
+        result = await connection.run(query, {"pairs": rows})
+        return result[0]["c"] if result else 0
+
+    async def bulk_disconnect(
+        self, pairs: list[tuple[uuid.UUID, uuid.UUID]], rel_type: str
+    ) -> int:
+        """
+        Usuwa relacje między wieloma parami węzłów jednym zapytaniem UNWIND.
+
+        :param pairs: Lista krotek `(from_uid, to_uid)`.
+        :return: Liczba usuniętych relacji.
+        """
+        if not pairs:
+            return 0
+        query = _bulk_disconnect_query(rel_type)
+        rows = [{"from": str(from_uid), "to": str(to_uid)} for from_uid, to_uid in pairs]
+        self.log.debug("Disconnecting %s node pairs.", len(rows), extra={"rel_type": rel_type})
+        result = await connection.run(query, {"pairs": rows})
+        return result[0]["c"] if result else 0
+
+    async def bulk_update_relationship(
+        self,
+        pairs: list[tuple[uuid.UUID, uuid.UUID, dict]],
+        rel_type: str,
+    ) -> int:
+        """
+        Aktualizuje właściwości relacji między wieloma parami węzłów jednym
+        zapytaniem UNWIND. Pary z pustymi właściwościami są pomijane.
+
+        :param pairs: Lista krotek `(from_uid, to_uid, properties)`.
+        :return: Liczba zaktualizowanych relacji.
+        """
+        rows = [
+            {"from": str(from_uid), "to": str(to_uid), "props": props}
+            for from_uid, to_uid, props in pairs
+            if props
+        ]
+        if not rows:
+            return 0
+        query = _bulk_update_relationship_query(rel_type)
+        self.log.debug("Updating %s relationships.", len(rows), extra={"rel_type": rel_type})
+        result = await connection.run(query, {"pairs": rows})
+        return result[0]["c"] if result else 0
+
     def _hydrate_prefetched(self, data: dict) -> "Node":
         return self._hydrate_recursive(self.model, data)
 
     def _hydrate_recursive(self, model_class: Type["Node"], node_data: dict) -> "Node":
         fields_to_validate = {}
         prefetched_rels = {}
-        internal_id = node_data.pop("_internal_id", None)
+        # Nie modyfikujemy danych wywołującego - klucz pomijamy w pętli
+        internal_id = node_data.get("_internal_id")
 
         for key, value in node_data.items():
+            if key == "_internal_id":
+                continue
             if key in model_class._relationships:
                 rel_descriptor = model_class._relationships[key]
-                target_model_class = node_registry.get(rel_descriptor.target_node_label)
-                if not target_model_class:
-                    raise TypeError(
-                        f"Nie znaleziono modelu dla etykiety '{rel_descriptor.target_node_label}'"
-                    )
+                target_model_class = rel_descriptor.target_class
 
-                # +++ WYWOŁANIE KONWERSJI DLA DANYCH RELACJI +++
-                # Robimy to tutaj, aby mieć pewność, że właściwości na relacjach też są konwertowane
-                value = _convert_neo4j_temporals(value)
-                
                 hydrated_rel_list = []
                 for rel_map in value:
                     nested_node_data = rel_map.get("node")
-                    rel_props_data = rel_map.get("rel", {})
 
                     if not nested_node_data:
                         continue
 
+                    # Węzeł docelowy konwertuje swoje pola w wywołaniu rekurencyjnym,
+                    # a właściwości relacji konwertujemy tutaj - jeden przebieg po danych
                     rel_node = self._hydrate_recursive(
                         target_model_class, nested_node_data
                     )
+                    rel_props_data = {
+                        k: _convert_leaf(v) for k, v in (rel_map.get("rel") or {}).items()
+                    }
 
                     if rel_descriptor.model:
                         hydrated_props = rel_descriptor.model.model_validate(
@@ -629,30 +1389,22 @@ class NodeManager:
 
                 prefetched_rels[rel_descriptor.private_name] = hydrated_rel_list
             else:
-                fields_to_validate[key] = value
+                # Konwersja typów temporalnych w tym samym przebiegu co podział pól
+                fields_to_validate[key] = _convert_leaf(value)
 
-        # +++ WYWOŁANIE KONWERSJI PRZED WALIDACJĄ PYDANTIC +++
-        fields_to_validate = _convert_neo4j_temporals(fields_to_validate)
-        
         node_instance = model_class.model_validate(fields_to_validate)
         if internal_id:
             node_instance._internal_id = internal_id
 
-        for private_name, rel_list in prefetched_rels.items():
-            setattr(node_instance, private_name, rel_list)
+        if prefetched_rels:
+            node_instance._rel_cache.update(prefetched_rels)
 
         return node_instance
 
     def _orderby_statement(self, node_alias: str, fields: list[str]) -> str:
         if not fields:
             return ""
-        clauses = [
-            f"{node_alias}.`{f[1:]}` DESC"
-            if f.startswith("-")
-            else f"{node_alias}.`{f}` ASC"
-            for f in fields
-        ]
-        return "ORDER BY " + ", ".join(clauses)
+        return _compile_orderby(node_alias, tuple(fields))
 
     def _where_statement(self, node_alias: str, filters: dict | Q) -> tuple[str, dict]:
         """
@@ -661,16 +1413,27 @@ class NodeManager:
         if not filters:
             return "", {}
 
-        q_obj = filters if isinstance(filters, Q) else Q(**filters)
-
-        # Licznik do generowania unikalnych nazw parametrów
-        param_counter = [0]
-        cypher, params = q_obj.to_cypher(node_alias, param_counter)
+        if isinstance(filters, dict):
+            # Szablon zależy tylko od zestawu kluczy - wartości trafiają do parametrów
+            keys = tuple(sorted(filters))
+            where_clause, param_names = _compile_dict_filter_shape(node_alias, keys)
+            # Wartości konwertujemy centralnie (np. UUID -> tekst, jak przy
+            # zapisie), więc wywołujący mogą przekazywać `node.uid` bez `str()`
+            params = {
+                name: _to_neo4j_value(filters[key])
+                for key, name in zip(keys, param_names)
+            }
+            return where_clause, params
 
-        if not cypher:
+        # Obiekty Q kompilujemy według kształtu drzewa, tak jak słowniki
+        # Sygnaturę i wartości zbieramy jednym przejściem po drzewie
+        values: list = []
+        where_clause, param_names = _compile_q_shape(node_alias, filters._shape(values))
+        if not where_clause:
             return "", {}
 
-        return f"WHERE {cypher}", params
+        params = dict(zip(param_names, map(_to_neo4j_value, values)))
+        return where_clause, params
 
 
 # ReturnQueryBuilder i reszta pomocniczych klas i metod pozostają bez zmian
@@ -691,41 +1454,40 @@ class ReturnQueryBuilder:
             self.prefetch = prefetch or {}
 
     def build(self) -> str:
-        projection_body = self._build_projection_for_model(
-            self.model, self.node_alias, self.prefetch
-        )
-        return f"RETURN {projection_body} AS node"
+        # Fragmenty są dopisywane do jednej listy i łączone raz, na końcu
+        out = ["RETURN "]
+        self._build_projection_for_model(self.model, self.node_alias, self.prefetch, out)
+        out.append(" AS node")
+        return "".join(out)
 
     def _build_projection_for_model(
-        self, model_class: Type["Node"], alias: str, prefetch_config: dict
-    ) -> str:
-        parts = [".*", f"_internal_id: elementId({alias})"]
+        self,
+        model_class: Type["Node"],
+        alias: str,
+        prefetch_config: dict,
+        out: list[str],
+    ) -> None:
+        out += (alias, " { .*, _internal_id: elementId(", alias, ")")
         for field_name, nested_prefetch in prefetch_config.items():
             rel_descriptor = model_class._relationships.get(field_name)
             if rel_descriptor is None:
                 raise ValueError(
                     f"'{field_name}' nie jest poprawną relacją w modelu '{model_class.__name__}'"
                 )
-            comprehension = self._build_comprehension_for_rel(
-                alias, rel_descriptor, nested_prefetch
-            )
-            parts.append(f"{field_name}: {comprehension}")
-        return f"{alias} {{ {', '.join(parts)} }}"
+            out += (", ", field_name, ": ")
+            self._build_comprehension_for_rel(alias, rel_descriptor, nested_prefetch, out)
+        out.append(" }")
 
     def _build_comprehension_for_rel(
-        self, parent_alias: str, rel: "RelationshipProperty", prefetch_config: dict
-    ) -> str:
-        target_model_class = node_registry.get(rel.target_node_label)
-        if not target_model_class:
-            raise TypeError(
-                f"Nie znaleziono modelu dla etykiety '{rel.target_node_label}'"
-            )
+        self,
+        parent_alias: str,
+        rel: "RelationshipProperty",
+        prefetch_config: dict,
+        out: list[str],
+    ) -> None:
+        target_model_class = rel.target_class
 
         target_alias = f"_{parent_alias}_{rel.private_name.strip('_')}"
-        target_projection = self._build_projection_for_model(
-            target_model_class, target_alias, prefetch_config
-        )
-
         rel_alias = f"r_{target_alias}"
         rel_pattern_body = f"[{rel_alias}:`{rel.relationship_type}`]"
 
@@ -736,8 +1498,212 @@ class ReturnQueryBuilder:
         else:
             path_pattern = f"-{rel_pattern_body}-"
 
-        full_path = f"({parent_alias}){path_pattern}{rel.target_node_pattern(alias=target_alias)}"
-
-        return (
-            f"[{full_path} | {{ rel: {rel_alias} {{.*}}, node: {target_projection} }}]"
+        out += (
+            "[(", parent_alias, ")", path_pattern,
+            rel.target_node_pattern(alias=target_alias),
+            " | { rel: ", rel_alias, " {.*}, node: ",
+        )
+        self._build_projection_for_model(
+            target_model_class, target_alias, prefetch_config, out
         )
+        out.append(" }]")
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_dict_filter_shape(
+    node_alias: str, keys: tuple[str, ...]
+) -> tuple[str, tuple[str, ...]]:
+    """
+    Kompiluje (i zapamiętuje) klauzulę WHERE dla filtrów-słowników o danym
+    zestawie kluczy. Zwraca gotową klauzulę oraz nazwy parametrów w kolejności
+    odpowiadającej `keys`.
+    """
+    q_obj = Q(**{key: None for key in keys})
+    cypher, params = q_obj.to_cypher(node_alias, [0])
+    return f"WHERE {cypher}", tuple(params)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_q_shape(node_alias: str, signature: tuple) -> tuple[str, tuple[str, ...]]:
+    """
+    Jak `_compile_dict_filter_shape`, ale dla obiektów Q - kluczem jest
+    struktura drzewa warunków (`Q._signature`), a nie wartości. Dla pustego
+    drzewa klauzula jest pusta.
+    """
+    cypher, params = Q._from_signature(signature).to_cypher(node_alias, [0])
+    return (f"WHERE {cypher}" if cypher else ""), tuple(params)
+
+
+def _validate_identifier(value: str, kind: str) -> str:
+    """Sprawdza, czy wartość może zostać bezpiecznie wstawiona do zapytania."""
+    if not isinstance(value, str) or not _IDENTIFIER_RE.match(value):
+        raise ValueError(f"Niepoprawny identyfikator ({kind}): {value!r}.")
+    return value
+
+
+# Typ relacji musi być częścią tekstu zapytania (Cypher nie przyjmuje go jako
+# parametru). Typów jest tyle, ile zadeklarowano w modelach, więc baza trzyma
+# po jednym planie na typ - a planista może korzystać z typu relacji, czego
+# nie zrobi przy dynamicznym `apoc.create.relationship`.
+@functools.lru_cache(maxsize=256)
+def _connect_query(rel_type: str) -> str:
+    rel_type = _validate_identifier(rel_type, "typ relacji")
+    return f"""
+        MATCH (a), (b)
+        WHERE a.uid = $from_uid AND b.uid = $to_uid
+        CREATE (a)-[r:`{rel_type}`]->(b)
+        SET r += $props
+        RETURN r
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _disconnect_query(rel_type: str) -> str:
+    rel_type = _validate_identifier(rel_type, "typ relacji")
+    return f"""
+        MATCH (a)-[r:`{rel_type}`]->(b)
+        WHERE a.uid = $from_uid AND b.uid = $to_uid
+        DELETE r
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _update_relationship_query(rel_type: str) -> str:
+    rel_type = _validate_identifier(rel_type, "typ relacji")
+    return f"""
+        MATCH (a)-[r:`{rel_type}`]->(b)
+        WHERE a.uid = $from_uid AND b.uid = $to_uid
+        SET r += $props
+        RETURN r
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _bulk_connect_query(rel_type: str) -> str:
+    rel_type = _validate_identifier(rel_type, "typ relacji")
+    return f"""
+        UNWIND $pairs AS p
+        MATCH (a {{uid: p.from}}), (b {{uid: p.to}})
+        CREATE (a)-[r:`{rel_type}`]->(b)
+        SET r += p.props
+        RETURN count(r) AS c
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _bulk_disconnect_query(rel_type: str) -> str:
+    rel_type = _validate_identifier(rel_type, "typ relacji")
+    return f"""
+        UNWIND $pairs AS p
+        MATCH (a {{uid: p.from}})-[r:`{rel_type}`]->(b {{uid: p.to}})
+        DELETE r
+        RETURN count(*) AS c
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _bulk_update_relationship_query(rel_type: str) -> str:
+    rel_type = _validate_identifier(rel_type, "typ relacji")
+    return f"""
+        UNWIND $pairs AS p
+        MATCH (a {{uid: p.from}})-[r:`{rel_type}`]->(b {{uid: p.to}})
+        SET r += p.props
+        RETURN count(r) AS c
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _bulk_update_query(labels: str, match_on: str, where: str = "") -> str:
+    match_on = _validate_identifier(match_on, "pole match_on")
+    return f"""
+        UNWIND $props_list as props
+        MATCH (node{labels} {{ `{match_on}`: props.`{match_on}` }})
+        {where}
+        SET node += props
+        RETURN count(node) as updated_count
+        """
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_orderby(node_alias: str, fields: tuple[str, ...]) -> str:
+    """
+    Kompiluje (i zapamiętuje) klauzulę ORDER BY. Prefiks '-' oznacza
+    sortowanie malejące; znaki '`' w nazwach pól są escapowane.
+    """
+    clauses = []
+    for field in fields:
+        direction = "ASC"
+        if field.startswith("-"):
+            field, direction = field[1:], "DESC"
+        escaped = field.replace("`", "``")
+        clauses.append(f"{node_alias}.`{escaped}` {direction}")
+    return "ORDER BY " + ", ".join(clauses)
+
+
+@functools.lru_cache(maxsize=256)
+def _values_columns(node_alias: str, fields: tuple[str, ...]) -> str:
+    """Kolumny RETURN dla values_list: `node.`a` AS v0, node.`b` AS v1, ...`."""
+    return ", ".join(
+        f"{node_alias}.`{_validate_identifier(field, 'nazwa pola')}` AS v{index}"
+        for index, field in enumerate(fields)
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _create_query(labels: str, keys: tuple[str, ...]) -> str:
+    """
+    Zapytanie CREATE dla `create`. Klucze pochodzą z `_dump_for_write`, więc
+    ich kolejność jest stała dla modelu i tekst zapytania jest współdzielony.
+    """
+    set_statement = "SET " + ", ".join(f"node.{key}=${key}" for key in keys) if keys else ""
+    return _CREATE_TMPL.format_map({"labels": labels, "set": set_statement})
+
+
+@functools.lru_cache(maxsize=256)
+def _merge_query(labels: str, keys: tuple[str, ...]) -> str:
+    """
+    Zapytanie MERGE dla get_or_create/update_or_create. Cypher nie mówi,
+    czy MERGE utworzył węzeł, więc przy tworzeniu ustawiamy tymczasowy
+    znacznik, odczytujemy go i od razu usuwamy.
+    """
+    match_map = ", ".join(
+        f"`{_validate_identifier(key, 'pole filtra')}`: $match_{i}"
+        for i, key in enumerate(keys)
+    )
+    return f"""
+        MERGE (node{labels} {{ {match_map} }})
+        ON CREATE SET node += $create_props, node.`{_CREATED_MARKER}` = true
+        ON MATCH SET node += $match_props
+        WITH node, node.`{_CREATED_MARKER}` IS NOT NULL AS created
+        REMOVE node.`{_CREATED_MARKER}`
+        RETURN node, elementId(node) AS internal_id, created
+        """
+
+
+def _freeze_prefetch(prefetch: Optional[list[str] | dict]) -> tuple:
+    """
+    Zamienia specyfikację prefetch (listę lub zagnieżdżony słownik) na
+    hashowalną krotkę `((nazwa_relacji, zagnieżdżony_prefetch), ...)`.
+    """
+    if not prefetch:
+        return ()
+    if isinstance(prefetch, dict):
+        return tuple((key, _freeze_prefetch(value)) for key, value in prefetch.items())
+    return tuple((key, ()) for key in prefetch)
+
+
+def _thaw_prefetch(frozen: tuple) -> dict:
+    """Odwrotność `_freeze_prefetch` - odtwarza zagnieżdżony słownik prefetch."""
+    return {key: _thaw_prefetch(nested) for key, nested in frozen}
+
+
+@functools.lru_cache(maxsize=512)
+def _build_return_clause(
+    node_alias: str, model: Type["Node"], frozen_prefetch: tuple
+) -> str:
+    """
+    Zwraca (zapamiętaną) klauzulę RETURN dla danego modelu i kształtu prefetch.
+    Projekcja zależy wyłącznie od struktury modeli, a nie od wartości zapytania.
+    """
+    builder = ReturnQueryBuilder(node_alias, model, _thaw_prefetch(frozen_prefetch))
+    return builder.build()
@@ -1,5 +1,6 @@
 # W pliku manager.py lub nowym pliku managers.py
 import logging  # ### ZMIANA ###
+from typing import ClassVar
 
 from .query import Q
 from .manager import NodeManager
@@ -11,48 +12,40 @@ class SoftDeleteManager(NodeManager):
     """
     Manager, który automatycznie filtruje zapytania, aby wykluczyć
     obiekty oznaczone jako is_deleted=True.
+
+    Filtr jest dokładany w `_where_statement`, przez który przechodzą
+    wszystkie zapytania z klauzulą WHERE (match_*, iter_all, count, exists,
+    aggregate, update, delete) - nie trzeba więc nadpisywać każdej metody.
     """
+    # Warunek jest stały, więc jest gotowym fragmentem Cypher (ze stałą
+    # zamiast parametru) - nie budujemy ani nie kompilujemy dla niego drzewa Q.
+    _ACTIVE_CYPHER: ClassVar[str] = "{alias}.`is_deleted` = false"
+
     # ### ZMIANA ###: Dodajemy logowanie do konstruktora, aby było jasne, że to specjalny menedżer
     def __init__(self, node_model):
         super().__init__(node_model)
         # Używamy loggera z klasy bazowej, który jest już specyficzny dla modelu
         self.log.info("Initialized SoftDeleteManager. Queries will be filtered for active objects (is_deleted=False).")
 
-    async def _apply_soft_delete_filter(self, filters: dict | Q | None = None) -> Q:
-        """Pomocnicza metoda do budowania filtra."""
-        active_filter = Q(is_deleted=False)
-
+    def _where_statement(self, node_alias: str, filters: dict | Q) -> tuple[str, dict]:
         # ### ZMIANA ###: Logowanie faktu dodania filtra
-        self.log.debug(
-            "Applying soft-delete filter (is_deleted=False) to the query.",
-            extra={"original_filters": filters}
-        )
-
-        if not filters:
-            return active_filter
-        
-        q_obj = filters if isinstance(filters, Q) else Q(**filters)
-        return active_filter & q_obj
-
-    async def match_all(self, filters: dict | Q | None = None, **kwargs):
-        final_filters = await self._apply_soft_delete_filter(filters)
-        return await super().match_all(filters=final_filters, **kwargs)
-
-    async def match_one(self, filters: dict | Q, **kwargs):
-        final_filters = await self._apply_soft_delete_filter(filters)
-        return await super().match_one(filters=final_filters, **kwargs)
-
-    async def count(self, filters: dict | Q | None = None, **kwargs) -> int:
-        final_filters = await self._apply_soft_delete_filter(filters)
-        return await super().count(filters=final_filters, **kwargs)
-    
-    # Metody update i delete też powinny być zmodyfikowane,
-    # aby operowały na właściwych obiektach.
-    # ### ZMIANA ###: Sugerowane implementacje z dodanym filtrowaniem
-    async def update(self, filters: dict | Q, data: dict) -> int:
-        final_filters = await self._apply_soft_delete_filter(filters)
-        return await super().update(filters=final_filters, data=data)
-        
-    async def delete(self, filters: dict | Q) -> int:
-        final_filters = await self._apply_soft_delete_filter(filters)
-        return await super().delete(filters=final_filters)
\ No newline at end of file
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Applying soft-delete filter (is_deleted=False) to the query.",
+                extra={"original_filters": filters}
+            )
+
+        active = self._ACTIVE_CYPHER.format(alias=node_alias)
+        where_clause, params = super()._where_statement(node_alias, filters)
+        if not where_clause:
+            return f"WHERE {active}", params
+        # Pomijamy prefiks "WHERE " klauzuli bazowej
+        return f"WHERE {active} AND ({where_clause[6:]})", params
+
+    # get_or_create/update_or_create mogą użyć MERGE, który nie przechodzi
+    # przez _where_statement - filtr dokładamy więc do samego słownika filtrów.
+    async def get_or_create(self, filters: dict, defaults: dict | None = None):
+        return await super().get_or_create({**filters, "is_deleted": False}, defaults)
+
+    async def update_or_create(self, filters: dict, defaults: dict):
+        return await super().update_or_create({**filters, "is_deleted": False}, defaults)
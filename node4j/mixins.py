@@ -1,7 +1,9 @@
 # NOWY PLIK: node4j/mixins.py
 from __future__ import annotations
+import asyncio
 import datetime
 import logging  # ### ZMIANA ###
+import uuid
 from .nodes import Node
 from .db import connection
 from .query import Q
@@ -9,6 +11,70 @@ from .query import Q
 # ### ZMIANA ###: Inicjalizacja loggera dla modułu
 log = logging.getLogger(__name__)
 
+# Stałe zapytania infrastruktury TTL
+_TTL_JOB_NAME = "ttl_cleanup_job"
+_TTL_INDEX_QUERY = "CREATE INDEX ttl_index IF NOT EXISTS FOR (n:TTL) ON (n.ttl)"
+_TTL_JOB_EXISTS_QUERY = (
+    "CALL apoc.periodic.list() YIELD name WHERE name = $job_name RETURN count(*) AS c"
+)
+_TTL_CLEANUP_QUERY = """
+MATCH (n:TTL) WHERE n.ttl IS NOT NULL AND n.ttl < datetime({timezone: 'UTC'})
+WITH n LIMIT 1000
+DETACH DELETE n
+RETURN count(n)
+"""
+_TTL_INSTALL_QUERY = """
+CALL apoc.periodic.repeat(
+    $job_name,
+    $cleanup_query,
+    3600 // Powtarzaj co 3600 sekund (1 godzina)
+)
+"""
+
+
+# Infrastruktura TTL jest wspólna dla wszystkich modeli - po pierwszym
+# udanym wywołaniu kolejne (np. z wielu modułów) nie odpytują już bazy.
+# Zapamiętujemy sterownik, dla którego ją zainstalowano: po `close()` i
+# ponownym połączeniu (np. z inną bazą) instalacja jest wykonywana ponownie.
+_ttl_setup_driver = None
+# Blokada tworzona leniwie, osobno dla każdej pętli zdarzeń - asyncio.Lock
+# wiąże się z pętlą, w której został pierwszy raz użyty
+_ttl_setup_lock: asyncio.Lock | None = None
+_ttl_setup_lock_loop: asyncio.AbstractEventLoop | None = None
+
+# Maksymalna liczba wierszy UNWIND w jednym zapytaniu bulk_set_expiry
+_BULK_EXPIRY_CHUNK_SIZE = 1000
+
+
+async def _install_ttl_infrastructure():
+    """Tworzy indeks TTL i (jeśli go brak) instaluje zadanie okresowe."""
+    # ### ZMIANA ###: Zastąpienie print loggerem
+    log.info("Setting up TTL infrastructure...")
+
+    # Wszystkie polecenia idą przez jedną współdzieloną sesję. Nie łączymy
+    # ich w jedną transakcję - Neo4j nie pozwala mieszać zmian schematu
+    # (CREATE INDEX) z innymi zapytaniami w tej samej transakcji.
+    async with connection.session():
+        log.debug("Creating TTL index if not exists.")
+        await connection.run(_TTL_INDEX_QUERY)
+
+        log.debug("Checking for existing '%s' periodic task.", _TTL_JOB_NAME)
+        # Filtrujemy po stronie bazy - wraca jeden wiersz, a nie lista wszystkich zadań
+        existing_jobs_result = await connection.run(
+            _TTL_JOB_EXISTS_QUERY, {"job_name": _TTL_JOB_NAME}
+        )
+        job_exists = existing_jobs_result[0]["c"] > 0
+
+        if not job_exists:
+            log.info("Periodic TTL cleanup job not found. Installing...")
+            await connection.run(
+                _TTL_INSTALL_QUERY,
+                {"job_name": _TTL_JOB_NAME, "cleanup_query": _TTL_CLEANUP_QUERY},
+            )
+            log.info("Successfully installed periodic TTL cleanup job.")
+        else:
+            log.info("Periodic TTL cleanup job already exists.")
+
 
 class TTLMixin(Node):
     """
@@ -22,41 +88,20 @@ class TTLMixin(Node):
     async def setup_ttl_infrastructure():
         """
         Instaluje w bazie indeks i zadanie okresowe potrzebne do obsługi TTL.
-        Tę metodę należy wywołać raz podczas startu aplikacji.
-        """
-        # ### ZMIANA ###: Zastąpienie print loggerem
-        log.info("Setting up TTL infrastructure...")
-        
-        log.debug("Creating TTL index if not exists.")
-        await connection.run(
-            "CREATE INDEX ttl_index IF NOT EXISTS FOR (n:TTL) ON (n.ttl)"
-        )
-
-        cleanup_query = """
-        MATCH (n:TTL) WHERE n.ttl IS NOT NULL AND n.ttl < datetime({timezone: 'UTC'})
-        WITH n LIMIT 1000
-        DETACH DELETE n
-        RETURN count(n)
-        """
-        
-        install_query = """
-        CALL apoc.periodic.repeat(
-            'ttl_cleanup_job',
-            $cleanup_query,
-            3600 // Powtarzaj co 3600 sekund (1 godzina)
-        )
+        Tę metodę należy wywołać raz podczas startu aplikacji; kolejne
+        wywołania dla tego samego połączenia nic nie robią.
         """
-        
-        log.debug("Checking for existing 'ttl_cleanup_job' periodic task.")
-        existing_jobs_result = await connection.run("CALL apoc.periodic.list()")
-        job_exists = any(job['name'] == 'ttl_cleanup_job' for job in existing_jobs_result)
-
-        if not job_exists:
-            log.info("Periodic TTL cleanup job not found. Installing...")
-            await connection.run(install_query, {"cleanup_query": cleanup_query})
-            log.info("Successfully installed periodic TTL cleanup job.")
-        else:
-            log.info("Periodic TTL cleanup job already exists.")
+        global _ttl_setup_driver, _ttl_setup_lock, _ttl_setup_lock_loop
+        loop = asyncio.get_running_loop()
+        if _ttl_setup_lock is None or _ttl_setup_lock_loop is not loop:
+            _ttl_setup_lock = asyncio.Lock()
+            _ttl_setup_lock_loop = loop
+        async with _ttl_setup_lock:
+            if connection.driver is not None and connection.driver is _ttl_setup_driver:
+                log.debug("TTL infrastructure already set up, skipping.")
+                return
+            await _install_ttl_infrastructure()
+            _ttl_setup_driver = connection.driver
 
     def set_expiry(self, lifespan: datetime.timedelta):
         """
@@ -65,16 +110,46 @@ class TTLMixin(Node):
         """
         self.ttl = datetime.datetime.now(datetime.timezone.utc) + lifespan
         # ### ZMIANA ###: Logowanie ustawienia daty wygaśnięcia
-        log.debug(
-            "Set expiry for node.", 
-            extra={"node_uid": str(self.uid), "expires_at": self.ttl.isoformat()}
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Set expiry for node.",
+                extra={"node_uid": self.uid_str, "expires_at": self.ttl.isoformat()}
+            )
+
+    @classmethod
+    async def bulk_set_expiry(
+        cls, uids: list[str | uuid.UUID], lifespan: datetime.timedelta
+    ) -> int:
+        """
+        Ustawia ten sam czas wygaśnięcia wielu węzłom naraz - jednym zapytaniem
+        UNWIND na każde `_BULK_EXPIRY_CHUNK_SIZE` węzłów, zamiast osobnego
+        `save_with_expiry` dla każdej instancji.
+
+        :param uids: Identyfikatory węzłów tego modelu.
+        :param lifespan: Czas życia od teraz.
+        :return: Liczba zaktualizowanych węzłów.
+        """
+        if not uids:
+            return 0
+        expiry = datetime.datetime.now(datetime.timezone.utc) + lifespan
+        query = (
+            f"UNWIND $uids AS uid MATCH (n{cls._labels_cypher} {{uid: uid}}) "
+            "SET n.ttl = $ttl RETURN count(n) AS c"
         )
+        uid_strings = [str(uid) for uid in uids]
+        updated = 0
+        for start in range(0, len(uid_strings), _BULK_EXPIRY_CHUNK_SIZE):
+            chunk = uid_strings[start:start + _BULK_EXPIRY_CHUNK_SIZE]
+            result = await connection.run(query, {"uids": chunk, "ttl": expiry})
+            updated += result[0]["c"] if result else 0
+        log.debug("Set expiry for %s nodes.", updated)
+        return updated
 
     async def save_with_expiry(self, lifespan: datetime.timedelta):
         """Pomocnicza metoda do ustawienia TTL i zapisu w jednym kroku."""
         self.set_expiry(lifespan)
         # Logowanie jest już w `self.q.update`
-        await self.q.update(filters={"uid": str(self.uid)}, data={"ttl": self.ttl})
+        await self.q.update(filters={"uid": self.uid_str}, data={"ttl": self.ttl})
 
 
 class SoftDeleteMixin(Node):
@@ -85,34 +160,50 @@ class SoftDeleteMixin(Node):
     deleted_at: datetime.datetime | None = None
 
     async def soft_delete(self):
-        """Oznacza instancję jako usuniętą."""
+        """
+        Oznacza instancję jako usuniętą. Jeśli instancja jest już oznaczona
+        jako usunięta, nic nie zapisujemy (zachowujemy też pierwotne `deleted_at`).
+        """
+        if self.is_deleted:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("soft_delete: node already deleted, skipping.", extra={"node_uid": self.uid_str})
+            return
+
         self.is_deleted = True
         self.deleted_at = datetime.datetime.now(datetime.timezone.utc)
 
         await self.q.update(
-            filters={"uid": str(self.uid)},
+            filters={"uid": self.uid_str},
             data={"is_deleted": True, "deleted_at": self.deleted_at},
         )
         # ### ZMIANA ###: Zastąpienie print loggerem
-        log.info(
-            "Node soft-deleted successfully.",
-            extra={"node_uid": str(self.uid), "deleted_at": self.deleted_at.isoformat()}
-        )
+        if log.isEnabledFor(logging.INFO):
+            log.info(
+                "Node soft-deleted successfully.",
+                extra={"node_uid": self.uid_str, "deleted_at": self.deleted_at.isoformat()}
+            )
 
     async def restore(self):
         """
-        Przywraca miękko usuniętą instancję.
+        Przywraca miękko usuniętą instancję. Instancja, która nie jest
+        oznaczona jako usunięta, nie wymaga zapisu.
         """
+        if not self.is_deleted and self.deleted_at is None:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("restore: node is not deleted, skipping.", extra={"node_uid": self.uid_str})
+            return
+
         self.is_deleted = False
         self.deleted_at = None
 
         # Używamy `all_objects`, aby mieć pewność, że znajdziemy usunięty obiekt
         await self.__class__.all_objects.update(
-            filters={"uid": str(self.uid)},
+            filters={"uid": self.uid_str},
             data={"is_deleted": False, "deleted_at": None},
         )
         # ### ZMIANA ###: Zastąpienie print loggerem
-        log.info("Node restored successfully.", extra={"node_uid": str(self.uid)})
+        if log.isEnabledFor(logging.INFO):
+            log.info("Node restored successfully.", extra={"node_uid": self.uid_str})
 
     @classmethod
     def setup_soft_delete_manager(cls):
@@ -131,7 +222,7 @@ class SoftDeleteMixin(Node):
         
         # ### ZMIANA ###: Zastąpienie print loggerem
         # Używamy loggera specyficznego dla klasy, na której wywoływana jest metoda
-        class_log = logging.getLogger(f"{__name__}.{cls.__name__}")
+        class_log = cls._log
         class_log.info(
             "Soft-delete manager installed.",
             extra={
@@ -2,8 +2,11 @@
 import uuid
 import datetime
 import logging  # ### ZMIANA ###
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pydantic import Field, BaseModel
 
+from node4j.db import connection, _current_transaction
 from node4j.nodes import Node
 from node4j.properties import RelationshipProperty, RelationshipDirection
 from node4j.edges import Edge
@@ -11,6 +14,13 @@ from node4j.edges import Edge
 # ### ZMIANA ###: Inicjalizacja loggera dla modułu
 log = logging.getLogger(__name__)
 
+UTC = datetime.timezone.utc
+
+
+def _utc_now() -> datetime.datetime:
+    """Bieżący czas w UTC ze strefą (zamiast przestarzałego `utcnow()`)."""
+    return datetime.datetime.now(UTC)
+
 
 class WorkAt(Edge):
     role: str
@@ -21,10 +31,91 @@ class AuditLog(Node):
     """Model do zapisywania logów o operacjach na innych węzłach."""
     target_uid: str
     action: str
-    timestamp: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    timestamp: datetime.datetime = Field(default_factory=_utc_now)
     message: str
 
 
+# Wpisy audytowe z haków są zapisywane od razu, w ścieżce zapisu węzła.
+# Wewnątrz `audit_log_batch()` są buforowane (osobno dla każdego kontekstu)
+# i zapisywane jednym zapytaniem UNWIND zamiast osobnej podróży do bazy na wpis.
+_AUDIT_INSERT_QUERY = f"UNWIND $rows AS r CREATE (a{AuditLog._labels_cypher}) SET a = r"
+# Po przekroczeniu tej liczby wpisów bufor partii jest opróżniany od razu
+_AUDIT_FLUSH_THRESHOLD = 500
+# Bufor bieżącej partii (None = brak partii, wpisy zapisujemy od razu).
+# Zadania uruchomione wewnątrz partii (np. asyncio.gather) dziedziczą kontekst,
+# więc dopisują do tego samego bufora.
+_audit_buffer_var: ContextVar[list[dict] | None] = ContextVar(
+    "node4j_audit_buffer", default=None
+)
+# Treść wpisu zależy tylko od akcji i imienia - szablony budujemy raz
+_AUDIT_MESSAGES = {
+    "CREATE": "Person '%s' was created.",
+    "UPDATE": "Person '%s' was updated.",
+}
+
+
+async def _queue_audit_log(target_uid: str, action: str, message: str) -> None:
+    row = {
+        "uid": str(uuid.uuid4()),
+        "target_uid": target_uid,
+        "action": action,
+        "timestamp": _utc_now(),
+        "message": message,
+    }
+    buffer = _audit_buffer_var.get()
+    if buffer is None:
+        await _write_audit_rows([row])
+        return
+    buffer.append(row)
+    if len(buffer) >= _AUDIT_FLUSH_THRESHOLD:
+        await _flush_buffer(buffer)
+
+
+async def _write_audit_rows(rows: list[dict]) -> None:
+    await connection.run(_AUDIT_INSERT_QUERY, {"rows": rows})
+    log.debug("Wrote audit logs.", extra={"count": len(rows)})
+
+
+async def _flush_buffer(buffer: list[dict]) -> None:
+    if not buffer:
+        return
+    # Zabieramy bufor przed `await`, aby wpisy dodane w międzyczasie
+    # trafiły do kolejnego opróżnienia, a nie zostały zgubione
+    rows = buffer.copy()
+    buffer.clear()
+    await _write_audit_rows(rows)
+
+
+@asynccontextmanager
+async def audit_log_batch():
+    """
+    Grupuje wpisy audytowe z haków wykonanych w bloku (np. przy bulk_create)
+    i zapisuje je jednym zapytaniem przy wyjściu z bloku. Bufor jest osobny
+    dla każdego kontekstu, a wpisy trafiają do tej samej transakcji co zapisy
+    węzłów, jeśli blok jest w niej zagnieżdżony.
+
+    Przy wyjątku wewnątrz transakcji wpisy są odrzucane (transakcja i tak
+    zostanie wycofana); poza transakcją zapisujemy wpisy zapisanych już węzłów.
+    """
+    if _audit_buffer_var.get() is not None:
+        # Zagnieżdżona partia korzysta z bufora zewnętrznej
+        yield
+        return
+
+    buffer: list[dict] = []
+    token = _audit_buffer_var.set(buffer)
+    try:
+        yield
+    except Exception:
+        if _current_transaction.get() is None:
+            await _flush_buffer(buffer)
+        raise
+    else:
+        await _flush_buffer(buffer)
+    finally:
+        _audit_buffer_var.reset(token)
+
+
 class Person(Node):
     name: str
     age: int
@@ -40,63 +131,69 @@ class Person(Node):
         constraints = [("email",)]
 
     # ### ZMIANA ###: Wprowadzenie dedykowanego loggera dla haków
-    def _get_hook_logger(self):
-        """Pomocnicza metoda do tworzenia loggera z kontekstem instancji."""
-        # Tworzy logger np. 'models.Person' i dodaje kontekst
-        logger = logging.getLogger(f"models.{self.__class__.__name__}")
-        return logger.getChild(str(self.uid))
+    def _get_hook_logger(self) -> logging.Logger:
+        """
+        Zwraca logger klasy (np. 'node4j.models.Person'), utworzony raz przez
+        metaklasę. Instancję identyfikuje pole `node_uid` w `extra` - osobny
+        logger potomny na każdy uid zostawałby w rejestrze logging na zawsze.
+        """
+        return self.__class__._log
 
 
     async def pre_save(self, *, is_creating: bool) -> None:
         """Przed zapisem ustawia znacznik czasu modyfikacji."""
         # ### ZMIANA ###: Zastąpienie print loggerem
         hook_log = self._get_hook_logger()
-        hook_log.debug(
-            "Executing pre_save hook", 
-            extra={"is_creating": is_creating, "person_name": self.name}
-        )
-        self.last_modified = datetime.datetime.utcnow()
+        # Słownik `extra` budujemy tylko, gdy wpis faktycznie zostanie zapisany
+        if hook_log.isEnabledFor(logging.DEBUG):
+            hook_log.debug(
+                "Executing pre_save hook",
+                extra={"node_uid": self.uid_str, "is_creating": is_creating, "person_name": self.name}
+            )
+        self.last_modified = _utc_now()
 
     async def post_save(self, *, is_creating: bool) -> None:
-        """Po zapisie tworzy wpis w logu audytowym."""
+        """Po zapisie tworzy wpis w logu audytowym (zob. `audit_log_batch`)."""
         action = "CREATE" if is_creating else "UPDATE"
         # ### ZMIANA ###: Zastąpienie print loggerem
         hook_log = self._get_hook_logger()
-        hook_log.info(
-            "Executing post_save hook, creating audit log.",
-            extra={"action": action, "person_name": self.name}
-        )
-        await AuditLog.q.create(
-            target_uid=str(self.uid),
-            action=action,
-            message=f"Person '{self.name}' was {action.lower()}d.",
+        if hook_log.isEnabledFor(logging.INFO):
+            hook_log.info(
+                "Executing post_save hook, creating audit log.",
+                extra={"node_uid": self.uid_str, "action": action, "person_name": self.name}
+            )
+        await _queue_audit_log(
+            self.uid_str, action, _AUDIT_MESSAGES[action] % self.name
         )
 
     async def pre_delete(self) -> None:
         """Przed usunięciem można by tu np. zarchiwizować dane."""
         # ### ZMIANA ###: Zastąpienie print loggerem
         hook_log = self._get_hook_logger()
-        hook_log.debug(
-            "Executing pre_delete hook",
-            extra={"person_name": self.name}
-        )
+        if hook_log.isEnabledFor(logging.DEBUG):
+            hook_log.debug(
+                "Executing pre_delete hook",
+                extra={"node_uid": self.uid_str, "person_name": self.name}
+            )
 
     async def post_delete(self) -> None:
         """Po usunięciu tworzy wpis w logu i usuwa powiązane dane."""
         # ### ZMIANA ###: Zastąpienie print loggerem
         hook_log = self._get_hook_logger()
-        hook_log.info(
-            "Executing post_delete hook, creating and cleaning up audit logs.",
-            extra={"person_name": self.name}
-        )
-        await AuditLog.q.create(
-            target_uid=str(self.uid),
-            action="DELETE",
-            message=f"Person '{self.name}' was deleted.",
-        )
+        if hook_log.isEnabledFor(logging.INFO):
+            hook_log.info(
+                "Executing post_delete hook, creating and cleaning up audit logs.",
+                extra={"node_uid": self.uid_str, "person_name": self.name}
+            )
+        # Wpis DELETE byłby od razu usunięty razem z pozostałymi wpisami tej
+        # osoby, więc go nie zapisujemy - odrzucamy tylko jej wpisy z bufora
+        target_uid = self.uid_str
+        buffer = _audit_buffer_var.get()
+        if buffer:
+            buffer[:] = [e for e in buffer if e["target_uid"] != target_uid]
         # ### ZMIANA ###: Logowanie operacji czyszczenia
         hook_log.debug("Deleting audit logs for the deleted person.")
-        await AuditLog.q.delete(filters={"target_uid": str(self.uid)})
+        await AuditLog.q.delete(filters={"target_uid": target_uid})
         hook_log.info("Audit logs for deleted person have been removed.")
 
 
@@ -1,44 +1,107 @@
 # node4j/nodes.py
 from __future__ import annotations
 
+import os
+import threading
 import uuid
 import logging  # ### ZMIANA ###
 from pydantic import BaseModel, Field, PrivateAttr
 from typing import ClassVar, Any
 
-from .registry import node_registry
-from .manager import NodeManager
+from .registry import register_node
+from .manager import NodeManager, LABEL_TYPE_MARKER
 
 # ### ZMIANA ###: Inicjalizacja loggera dla modułu
 log = logging.getLogger(__name__)
 
+# Domyślna wartość dla baz bez zagregowanych atrybutów (tylko do odczytu)
+_EMPTY: dict = {}
+
+# Liczba UUID losowanych jednym wywołaniem os.urandom
+_UUID_POOL_SIZE = 4096
+# Bity wersji (4) i wariantu (RFC 4122) - ustawiane tak samo jak w uuid.uuid4
+_UUID4_CLEAR = ~((0xC000 << 48) | (0xF000 << 64))
+_UUID4_SET = (0x8000 << 48) | (4 << 76)
+# Pula gotowych wartości UUID per wątek - bez blokady przy każdym nowym węźle
+_uuid_pool = threading.local()
+
+
+def _reset_uuid_pool() -> None:
+    # Proces potomny nie może dzielić puli z rodzicem (powtórzone UUID)
+    global _uuid_pool
+    _uuid_pool = threading.local()
+
+
+os.register_at_fork(after_in_child=_reset_uuid_pool)
+
+
+def _fill_uuid_pool() -> list[int]:
+    data = os.urandom(16 * _UUID_POOL_SIZE)
+    from_bytes = int.from_bytes
+    return [
+        (from_bytes(data[offset:offset + 16]) & _UUID4_CLEAR) | _UUID4_SET
+        for offset in range(0, len(data), 16)
+    ]
+
+
+def _fast_uuid4() -> uuid.UUID:
+    """
+    Odpowiednik `uuid.uuid4()`. Losowe bajty są pobierane jednym wywołaniem
+    os.urandom na `_UUID_POOL_SIZE` węzłów i od razu zamieniane na liczby
+    z ustawionymi bitami wersji, więc tworzenie UUID sprowadza się do `pop`.
+    """
+    pool = _uuid_pool
+    try:
+        values = pool.values
+    except AttributeError:
+        values = pool.values = []
+    if not values:
+        values.extend(_fill_uuid_pool())
+    return uuid.UUID(int=values.pop())
+
 
 class NodeBase(type(BaseModel)):
     def __new__(mcs, name: str, bases: tuple[type, ...], attrs: dict[str, Any]):
         # ### ZMIANA ###: Logowanie rozpoczęcia tworzenia nowej klasy modelu
         # Używamy loggera specyficznego dla tworzonej klasy, np. "node4j.nodes.Person"
         class_log = log.getChild(name)
-        if name != "Node":
-            class_log.debug(f"Node class '{name}' is being created by metaclass.")
+        # Każda baza ma już spłaszczone atrybuty swoich przodków, więc
+        # wystarcza jedno `update` na bezpośrednią bazę. Poziom logowania
+        # sprawdzamy raz - przy imporcie modeli debug jest zwykle wyłączony.
+        debug_enabled = name != "Node" and class_log.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            class_log.debug("Node class '%s' is being created by metaclass.", name)
 
         from .properties import RelationshipProperty
 
-        # --- Przetwarzanie relacji ---
+        # --- Jeden przebieg po bazach: relacje, opcje Meta i etykiety ---
         relationships: dict[str, RelationshipProperty] = {}
+        base_metas: list[dict] = []
+        all_labels = set()
         for base in bases:
-            if hasattr(base, "_relationships"):
-                relationships.update(base._relationships)
-        current_class_rels = {}
-        for attr_name, value in list(attrs.items()):
-            if isinstance(value, RelationshipProperty):
-                current_class_rels[attr_name] = value
-                del attrs[attr_name]
+            relationships.update(getattr(base, "_relationships", _EMPTY))
+            all_labels.update(getattr(base, "__labels__", ()))
+            base_meta = getattr(base, "_meta", None)
+            if base_meta:
+                base_metas.append(base_meta)
+
+        # --- Przetwarzanie relacji ---
+        # Jeden przebieg po atrybutach klasy; relacje usuwamy z `attrs`,
+        # aby pydantic nie traktował ich jako pól
+        current_class_rels = {
+            attr_name: value
+            for attr_name, value in attrs.items()
+            if isinstance(value, RelationshipProperty)
+        }
+        for attr_name in current_class_rels:
+            del attrs[attr_name]
         relationships.update(current_class_rels)
         
         # ### ZMIANA ###: Logowanie znalezionych relacji
-        if name != "Node" and relationships:
-             class_log.debug(
-                f"Processed {len(relationships)} relationships.",
+        if debug_enabled and relationships:
+            class_log.debug(
+                "Processed %s relationships.",
+                len(relationships),
                 extra={"relationship_names": list(relationships.keys())}
             )
 
@@ -52,10 +115,10 @@ class NodeBase(type(BaseModel)):
         kls._relationships = relationships
 
         # --- Przetwarzanie klasy Meta ---
+        # Opcje pierwszej bazy mają pierwszeństwo, więc nakładamy je na końcu
         meta_options = {}
-        for base in reversed(bases):
-            if hasattr(base, "_meta"):
-                meta_options.update(base._meta)
+        for base_meta in reversed(base_metas):
+            meta_options.update(base_meta)
         if "Meta" in attrs:
             meta_class = attrs["Meta"]
             current_meta = {
@@ -65,41 +128,53 @@ class NodeBase(type(BaseModel)):
         kls._meta = meta_options
         
         # ### ZMIANA ###: Logowanie przetworzonych opcji Meta
-        if name != "Node" and meta_options:
-            class_log.debug(f"Processed Meta options.", extra={"meta_options": meta_options})
+        if debug_enabled and meta_options:
+            class_log.debug("Processed Meta options.", extra={"meta_options": meta_options})
 
 
         # --- Przetwarzanie etykiet (__labels__) ---
-        all_labels = set()
-        for base in bases:
-            if hasattr(base, "__labels__"):
-                all_labels.update(base.__labels__)
         if name != "Node":
             all_labels.add(name)
-        kls.__labels__ = sorted(list(all_labels))
+        # Krotka jest niezmienna i współdzielona; zbiór służy do szybkiego
+        # sprawdzania przynależności etykiety
+        kls.__labels__ = tuple(sorted(all_labels))
+        kls.__labels_set__ = frozenset(all_labels)
+        # Dane stałe dla klasy, używane przy budowie każdego zapytania
+        kls._labels_cypher = LABEL_TYPE_MARKER + LABEL_TYPE_MARKER.join(kls.__labels__)
+        kls._dump_exclude = frozenset(relationships)
+        # Logger klasy tworzymy raz - `getLogger` przy każdym wywołaniu
+        # bierze globalną blokadę modułu logging
+        kls._log = logging.getLogger(f"{kls.__module__}.{name}")
 
         # ### ZMIANA ###: Logowanie finalnych etykiet
-        if name != "Node":
-            class_log.debug(f"Final labels set.", extra={"labels": kls.__labels__})
+        if debug_enabled:
+            class_log.debug("Final labels set.", extra={"labels": kls.__labels__})
 
 
         # --- Rejestracja modelu i managera ---
         if name != "Node":
-            node_registry[name] = kls
+            register_node(kls)
             kls.q = NodeManager(kls)
             # ### ZMIANA ###: Logowanie rejestracji modelu
-            class_log.info(f"Node class '{name}' registered successfully with a NodeManager.")
+            class_log.info("Node class '%s' registered successfully with a NodeManager.", name)
             
         return kls
 
 
 class Node(BaseModel, metaclass=NodeBase):
-    uid: uuid.UUID = Field(default_factory=uuid.uuid4)
+    uid: uuid.UUID = Field(default_factory=_fast_uuid4)
     _internal_id: str | None = PrivateAttr(default=None)
+    # Dane relacji pobrane przez RelationshipManager (lub prefetch_related),
+    # kluczowane nazwą prywatną relacji, np. '_works_at'
+    _rel_cache: dict[str, Any] = PrivateAttr(default_factory=dict)
 
     _relationships: ClassVar[dict[str, "RelationshipProperty"]]
     _meta: ClassVar[dict[str, Any]] = {}
-    __labels__: ClassVar[list[str]] = []
+    __labels__: ClassVar[tuple[str, ...]] = ()
+    __labels_set__: ClassVar[frozenset[str]] = frozenset()
+    _labels_cypher: ClassVar[str] = ""
+    _dump_exclude: ClassVar[frozenset[str]] = frozenset()
+    _log: ClassVar[logging.Logger]
 
     q: ClassVar[NodeManager]
 
@@ -107,7 +182,19 @@ class Node(BaseModel, metaclass=NodeBase):
 
     @classmethod
     def labels(cls) -> list[str]:
-        return cls.__labels__
+        return list(cls.__labels__)
+
+    @property
+    def uid_str(self) -> str:
+        """
+        Tekstowa postać `uid` (tak jest przechowywany w bazie). Liczona przy
+        każdym odczycie - `uid` może zostać zmieniony (przypisanie, model_copy).
+        """
+        return str(self.uid)
+
+    def clear_relationship_cache(self) -> None:
+        """Unieważnia zapamiętane dane wszystkich relacji tej instancji."""
+        self._rel_cache.clear()
 
     def __str__(self) -> str:
         return f"<{self.__class__.__name__} uid={self.uid}>"
@@ -120,11 +207,17 @@ class Node(BaseModel, metaclass=NodeBase):
     # Logowanie powinno być implementowane w nadpisanych wersjach.
 
     async def pre_save(self, *, is_creating: bool) -> None:
-        """Wywoływane przed operacją create lub update."""
+        """
+        Wywoływane przed operacją create lub update.
+        W bulk_create/bulk_update haki wielu instancji działają współbieżnie.
+        """
         pass
 
     async def post_save(self, *, is_creating: bool) -> None:
-        """Wywoływane po operacji create lub update."""
+        """
+        Wywoływane po operacji create lub update.
+        W bulk_create/bulk_update haki wielu instancji działają współbieżnie.
+        """
         pass
 
     async def pre_delete(self) -> None:
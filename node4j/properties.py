@@ -1,13 +1,15 @@
 # node4j/properties.py (poprawiona i uzupełniona wersja)
 from __future__ import annotations
 import enum
+import functools
 import logging  # ### ZMIANA ###
 from collections.abc import Mapping
 from typing import TYPE_CHECKING, Any, cast, Type
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from neo4j.graph import Relationship
 
+from . import cache as node_cache
 from .registry import node_registry
 from .db import connection
 from .edges import Edge
@@ -18,21 +20,53 @@ if TYPE_CHECKING:
 # ### ZMIANA ###: Inicjalizacja loggera dla modułu
 log = logging.getLogger(__name__)
 
+# Maksymalna liczba relacji wysyłanych w jednym zapytaniu UNWIND
+# przez connect_many/disconnect_many
+BULK_RELATIONSHIP_CHUNK_SIZE = 1000
+
+# Zapytanie pobierające węzły powiązane relacją; `rel` i `target` to wzorce
+# z RelationshipProperty (składane raz w __set_name__)
+_FETCH_QUERY_TMPL = (
+    "MATCH (start){rel}{target} "
+    "WHERE elementId(start) = $start_id "
+    "RETURN elementId(node) AS node_id, properties(node) AS node_props, "
+    "properties(r) AS rel_props"
+)
+
+
+def _edge_props(properties: dict | Edge | None) -> dict:
+    """Zamienia właściwości relacji (model Edge lub słownik) na słownik parametrów."""
+    if isinstance(properties, Edge):
+        return properties.model_dump(mode="json")
+    if isinstance(properties, dict):
+        return properties
+    return {}
+
+
+# Znacznik braku wpisu w cache relacji (None/[] to poprawne wartości)
+_MISSING = object()
+
+
 class RelationshipDirection(enum.Enum):
     IN, OUT, UNDIRECTED = "IN", "OUT", "UNDIRECTED"
 
 
 # +++ NOWA KLASA: RelationshipManager +++
 class RelationshipManager:
+    # Menedżer powstaje przy pierwszym odwołaniu do relacji na instancji -
+    # bez __dict__ jest mniejszy i szybszy w dostępie do atrybutów
+    __slots__ = ("_instance", "_relationship", "_cache_name", "_log", "_extra")
+
     def __init__(self, instance: "Node", relationship: "RelationshipProperty"):
         self._instance = instance
         self._relationship = relationship
         self._cache_name = relationship.private_name
-        # ### ZMIANA ###: Tworzymy logger specyficzny dla relacji na konkretnej instancji
-        # np. 'node4j.properties.RelationshipManager.Person[uid].works_at'
-        self._log = log.getChild(
-            f"RelationshipManager.{self._instance.__class__.__name__}[{self._instance.uid}].{self._relationship.private_name.strip('_')}"
-        )
+        # ### ZMIANA ###: Logger jest tworzony raz na relację (w __set_name__),
+        # np. 'node4j.properties.RelationshipManager.Person.works_at'; instancję
+        # identyfikuje pole `node_uid`. Osobny logger na uid zostawałby
+        # w rejestrze logging na zawsze.
+        self._log = relationship._log
+        self._extra = {"node_uid": instance.uid_str}
 
     def __await__(self):
         """Umożliwia `await alice.works_at` dla lazy loadingu."""
@@ -40,25 +74,33 @@ class RelationshipManager:
 
     async def _fetch(self) -> list[tuple["Node", Edge | dict]]:
         """Logika pobierania danych, przeniesiona z AwaitableRelationship."""
-        if hasattr(self._instance, self._cache_name):
+        cache = self._instance._rel_cache
+        cached = cache.get(self._cache_name, _MISSING)
+        if cached is not _MISSING:
             # ### ZMIANA ###: Logowanie trafienia w cache
-            self._log.debug("Relationship data loaded from cache.")
-            return getattr(self._instance, self._cache_name)
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("Relationship data loaded from cache.", extra=self._extra)
+            return cached
         
         # ### ZMIANA ###: Logowanie pobierania danych z bazy
-        self._log.debug("Cache miss. Fetching relationship data from database.")
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug(
+                "Cache miss. Fetching relationship data from database.", extra=self._extra
+            )
         fetched_data = await self._relationship._async_fetch(self._instance)
         
-        setattr(self._instance, self._cache_name, fetched_data)
-        self._log.info(f"Fetched {len(fetched_data)} related nodes.")
+        cache[self._cache_name] = fetched_data
+        self._log.info("Fetched %d related nodes.", len(fetched_data), extra=self._extra)
         return fetched_data
 
     def _clear_cache(self):
         """Czyści cache po modyfikacji relacji."""
-        if hasattr(self._instance, self._cache_name):
+        if self._instance._rel_cache.pop(self._cache_name, _MISSING) is not _MISSING:
             # ### ZMIANA ###: Logowanie czyszczenia cache
-            self._log.debug("Clearing relationship cache due to modification.")
-            delattr(self._instance, self._cache_name)
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug(
+                    "Clearing relationship cache due to modification.", extra=self._extra
+                )
 
     async def connect(self, target_node: "Node", properties: dict | Edge | None = None):
         """Tworzy relację od bieżącej instancji do węzła docelowego."""
@@ -66,71 +108,142 @@ class RelationshipManager:
             raise ValueError("Oba węzły muszą być zapisane w bazie (mieć UID).")
 
         # ### ZMIANA ###: Logowanie operacji
-        self._log.info(
-            f"Connecting to node.",
-            extra={
-                "target_node_class": target_node.__class__.__name__,
-                "target_node_uid": str(target_node.uid),
-            },
-        )
+        if self._log.isEnabledFor(logging.INFO):
+            self._log.info(
+                "Connecting to node.",
+                extra={
+                    **self._extra,
+                    "target_node_class": target_node.__class__.__name__,
+                    "target_node_uid": target_node.uid_str,
+                },
+            )
         
-        props_dict = {}
-        if isinstance(properties, Edge):
-            props_dict = properties.model_dump(mode="json")
-        elif isinstance(properties, dict):
-            props_dict = properties
+        props_dict = _edge_props(properties)
 
-        from_uid = self._instance.uid
-        to_uid = target_node.uid
+        from_uid = self._instance.uid_str
+        to_uid = target_node.uid_str
 
         # Ustalenie kierunku zapytania
         if self._relationship.relationship_direction == RelationshipDirection.IN:
             from_uid, to_uid = to_uid, from_uid
 
+        # Import lokalny - manager.py importuje ten moduł
+        from .manager import _connect_query
+
         await connection.run(
-            f"""
-            MATCH (a), (b)
-            WHERE a.uid = $from_uid AND b.uid = $to_uid
-            CREATE (a)-[r:`{self._relationship.relationship_type}`]->(b)
-            SET r += $props
-            """,
+            _connect_query(self._relationship.relationship_type),
             params={
-                "from_uid": str(from_uid),
-                "to_uid": str(to_uid),
+                "from_uid": from_uid,
+                "to_uid": to_uid,
                 "props": props_dict,
             },
         )
         self._clear_cache()
-        self._log.info("Connection successful.")
+        self._log.info("Connection successful.", extra=self._extra)
 
 
     async def disconnect(self, target_node: "Node"):
         """Usuwa relację między bieżącą instancją a węzłem docelowym."""
         # ### ZMIANA ###: Logowanie operacji
-        self._log.info(
-            f"Disconnecting from node.",
-            extra={
-                "target_node_class": target_node.__class__.__name__,
-                "target_node_uid": str(target_node.uid),
-            },
-        )
+        if self._log.isEnabledFor(logging.INFO):
+            self._log.info(
+                "Disconnecting from node.",
+                extra={
+                    **self._extra,
+                    "target_node_class": target_node.__class__.__name__,
+                    "target_node_uid": target_node.uid_str,
+                },
+            )
 
-        from_uid = self._instance.uid
-        to_uid = target_node.uid
+        from_uid = self._instance.uid_str
+        to_uid = target_node.uid_str
 
         if self._relationship.relationship_direction == RelationshipDirection.IN:
             from_uid, to_uid = to_uid, from_uid
 
+        from .manager import _disconnect_query
+
         await connection.run(
-            f"""
-            MATCH (a)-[r:`{self._relationship.relationship_type}`]->(b)
-            WHERE a.uid = $from_uid AND b.uid = $to_uid
-            DELETE r
-            """,
-            params={"from_uid": str(from_uid), "to_uid": str(to_uid)},
+            _disconnect_query(self._relationship.relationship_type),
+            params={"from_uid": from_uid, "to_uid": to_uid},
         )
         self._clear_cache()
-        self._log.info("Disconnection successful.")
+        self._log.info("Disconnection successful.", extra=self._extra)
+
+    def _pair_rows(self, targets: list["Node"]) -> list[dict]:
+        """Buduje wiersze `{from, to}` dla UNWIND, z uwzględnieniem kierunku relacji."""
+        own_uid = self._instance.uid_str
+        incoming = self._relationship.relationship_direction == RelationshipDirection.IN
+        rows = []
+        for target_node in targets:
+            target_uid = target_node.uid_str
+            if incoming:
+                rows.append({"from": target_uid, "to": own_uid})
+            else:
+                rows.append({"from": own_uid, "to": target_uid})
+        return rows
+
+    async def connect_many(
+        self,
+        targets: list["Node"],
+        properties: list[dict | Edge | None] | None = None,
+    ) -> int:
+        """
+        Tworzy relacje do wielu węzłów docelowych jednym zapytaniem UNWIND
+        (na każde `BULK_RELATIONSHIP_CHUNK_SIZE` relacji), zamiast osobnego
+        `connect` dla każdego węzła.
+
+        :param targets: Węzły docelowe.
+        :param properties: Opcjonalne właściwości relacji, w kolejności `targets`.
+        :return: Liczba utworzonych relacji.
+        """
+        if not targets:
+            return 0
+        if properties is not None and len(properties) != len(targets):
+            raise ValueError("Lista properties musi mieć tyle elementów co targets.")
+
+        rows = self._pair_rows(targets)
+        for row, props in zip(rows, properties or [None] * len(rows)):
+            row["props"] = _edge_props(props)
+
+        from .manager import _bulk_connect_query
+
+        created = await self._run_chunked(
+            _bulk_connect_query(self._relationship.relationship_type), rows
+        )
+        self._clear_cache()
+        self._log.info("Connected to %s nodes.", created, extra=self._extra)
+        return created
+
+    async def disconnect_many(self, targets: list["Node"]) -> int:
+        """
+        Usuwa relacje do wielu węzłów docelowych jednym zapytaniem UNWIND
+        (na każde `BULK_RELATIONSHIP_CHUNK_SIZE` relacji).
+
+        :return: Liczba usuniętych relacji.
+        """
+        if not targets:
+            return 0
+
+        from .manager import _bulk_disconnect_query
+
+        deleted = await self._run_chunked(
+            _bulk_disconnect_query(self._relationship.relationship_type),
+            self._pair_rows(targets),
+        )
+        self._clear_cache()
+        self._log.info("Disconnected from %s nodes.", deleted, extra=self._extra)
+        return deleted
+
+    @staticmethod
+    async def _run_chunked(query: str, rows: list[dict]) -> int:
+        total = 0
+        for start in range(0, len(rows), BULK_RELATIONSHIP_CHUNK_SIZE):
+            result = await connection.run(
+                query, {"pairs": rows[start:start + BULK_RELATIONSHIP_CHUNK_SIZE]}
+            )
+            total += result[0]["c"] if result else 0
+        return total
 
 
 
@@ -151,18 +264,58 @@ class RelationshipProperty:
             relationship_direction,
         )
         self.private_name = ""
+        self._manager_key = ""
+        self._fetch_query = ""
+        self._log = log
         self.model = model
+        # Klasa modelu docelowego - rozwiązywana leniwie (przy definicji relacji
+        # model docelowy może jeszcze nie istnieć) i zapamiętywana
+        self._target_class: Type["Node"] | None = None
 
     def __set_name__(self, owner: type["Node"], name: str):
         if not name:
             raise ValueError("RelationshipProperty musi mieć nazwę!")
         self.private_name = f"_{name}"
+        self._manager_key = f"_{name}_mgr"
+        self._log = log.getChild(f"RelationshipManager.{owner.__name__}.{name}")
+        # Wzorce relacji i węzła docelowego są stałe dla deskryptora, więc
+        # zapytanie pobierające relację składamy raz, przy definicji klasy
+        self._fetch_query = _FETCH_QUERY_TMPL.format_map(
+            {
+                "rel": self.relationship_pattern(),
+                "target": self.target_node_pattern("node"),
+            }
+        )
 
     def __get__(self, instance: "Node", owner: type["Node"]) -> Any:
         if instance is None:
             return self
-        # ZWRACAMY NOWY MENEDŻER ZAMIAST AWAITABLE
-        return RelationshipManager(instance=instance, relationship=self)
+        # Menedżer jest zapamiętywany na instancji - kolejne odwołania
+        # (`alice.works_at`) nie tworzą nowego obiektu. Sprawdzamy, czy należy
+        # do tej instancji, bo kopia modelu (model_copy) kopiuje też __dict__.
+        manager = instance.__dict__.get(self._manager_key)
+        if manager is None or manager._instance is not instance:
+            manager = RelationshipManager(instance=instance, relationship=self)
+            instance.__dict__[self._manager_key] = manager
+        return manager
+
+    @functools.cached_property
+    def _edges_adapter(self) -> TypeAdapter:
+        """Walidator listy właściwości relacji (modelu `self.model`)."""
+        return TypeAdapter(list[self.model])
+
+    @property
+    def target_class(self) -> Type["Node"]:
+        """Zwraca (zapamiętaną) klasę modelu docelowego z rejestru."""
+        target_class = self._target_class
+        if target_class is None:
+            target_class = node_registry.get(self.target_node_label)
+            if target_class is None:
+                raise TypeError(
+                    f"Nie znaleziono modelu dla etykiety '{self.target_node_label}'"
+                )
+            self._target_class = target_class
+        return target_class
 
     def relationship_pattern(self) -> str:
         """Zwraca wzorzec relacji dla zapytania, np. '-[r:WORK_AT]->'."""
@@ -177,46 +330,80 @@ class RelationshipProperty:
         """Zwraca wzorzec węzła docelowego, np. '(company:Company)'."""
         return f"({alias}:`{self.target_node_label}`)"
 
+    @staticmethod
+    def _hydrate(
+        target_node_class: type["Node"], node_ids: list[str], node_datas: list[dict]
+    ) -> list["Node"]:
+        # Cała partia jest walidowana jednym wywołaniem (adapter listy managera
+        # modelu docelowego), a nie osobnym model_validate na każdy wiersz
+        nodes = target_node_class.q._list_adapter.validate_python(node_datas)
+        for node, node_id in zip(nodes, node_ids):
+            node._internal_id = node_id
+        return nodes
+
+    @classmethod
+    def _hydrate_cached(
+        cls,
+        target_node_class: type["Node"],
+        node_ids: list[str],
+        node_datas: list[dict],
+    ) -> list["Node"]:
+        """Jak `_hydrate`, ale węzły obecne w `node4j.cache` nie są walidowane ponownie."""
+        nodes: list["Node | None"] = [
+            node_cache.get(target_node_class, node_id, node_data)
+            for node_id, node_data in zip(node_ids, node_datas)
+        ]
+        misses = [i for i, node in enumerate(nodes) if node is None]
+        if misses:
+            validated = cls._hydrate(
+                target_node_class,
+                [node_ids[i] for i in misses],
+                [node_datas[i] for i in misses],
+            )
+            for i, node in zip(misses, validated):
+                nodes[i] = node
+                node_cache.put(target_node_class, node_ids[i], node_datas[i], node)
+        return cast(list["Node"], nodes)
+
     async def _async_fetch(self, instance: "Node") -> list[tuple["Node", Edge | dict]]:
-        target_node_class = node_registry.get(self.target_node_label)
-        if not target_node_class:
+        try:
+            target_node_class = self.target_class
+        except TypeError:
             log.error(
-                f"Target model '{self.target_node_label}' for relationship is not registered.",
+                "Target model '%s' for relationship is not registered.",
+                self.target_node_label,
                 extra={"relationship_type": self.relationship_type}
             )
             raise TypeError(
                 f"Model '{self.target_node_label}' nie jest zarejestrowany."
-            )
-
-        rel_pattern = self.relationship_pattern()
-        target_pattern = self.target_node_pattern("node")
+            ) from None
 
-        query = f"""
-        MATCH (start){rel_pattern}{target_pattern}
-        WHERE elementId(start) = $start_id
-        RETURN node {{ .*, _internal_id: elementId(node) }} as node_data, r {{ .* }} as rel_props
-        """
+        # Import lokalny - manager importuje ten moduł (cykl importów)
+        from .manager import _convert_properties
 
         params = {"start_id": instance._internal_id}
-        result_set = await connection.run(query, params)
-
-        hydrated_results = []
-        for row in result_set:
-            node_data = row.get("node_data")
-            if not node_data:
-                continue
-
-            # Tworzymy instancję węzła docelowego
-            node = target_node_class.model_validate(node_data)
-            node._internal_id = node_data.get("_internal_id")
-
-            rel_properties = row.get("rel_props") or {}
-
-            # Jeśli mamy model dla relacji, użyjmy go!
-            if self.model:
-                hydrated_props = self.model.model_validate(rel_properties)
-            else:
-                hydrated_props = rel_properties
 
-            hydrated_results.append((node, hydrated_props))
-        return hydrated_results
+        # Rekordy odbieramy strumieniowo - listy kolumn rosną w miarę
+        # napływania paczek z serwera, bez pośredniej listy wszystkich wierszy
+        node_ids: list[str] = []
+        node_datas: list[dict] = []
+        rel_props_list: list[dict] = []
+        async for row in connection.stream(self._fetch_query, params):
+            node_ids.append(row["node_id"])
+            # Typy temporalne sterownika (np. neo4j.time.DateTime) zamieniamy
+            # na natywne przed walidacją - także przed porównaniem w node4j.cache
+            node_datas.append(_convert_properties(row["node_props"]))
+            rel_props_list.append(_convert_properties(row["rel_props"] or {}))
+
+        if node_cache.enabled():
+            nodes = self._hydrate_cached(target_node_class, node_ids, node_datas)
+        else:
+            nodes = self._hydrate(target_node_class, node_ids, node_datas)
+
+        # Jeśli mamy model dla relacji, użyjmy go!
+        if self.model:
+            hydrated_props = self._edges_adapter.validate_python(rel_props_list)
+        else:
+            hydrated_props = rel_props_list
+
+        return list(zip(nodes, hydrated_props))
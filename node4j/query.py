@@ -3,6 +3,18 @@
 from __future__ import annotations
 import enum
 
+# Mapowanie sufiksów lookupów (np. `age__gt`) na operatory Cypher
+_OPERATOR_MAP = {
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "in": "IN",
+    "contains": "CONTAINS",
+    "startswith": "STARTS WITH",
+    "endswith": "ENDS WITH",
+    "ne": "<>",
+}
 
 class QConnector(str, enum.Enum):
     AND = "AND"
@@ -12,7 +24,11 @@ class QConnector(str, enum.Enum):
 class Q:
     """Reprezentuje warunek lub grupę warunków w zapytaniu (klauzula WHERE)."""
 
+    __slots__ = ("children", "connector", "negated")
+
     def __init__(self, **kwargs):
+        # Dzieci są uzupełniane tylko tutaj; później lista jest traktowana jako
+        # niezmienna i może być współdzielona między obiektami Q
         self.children: list[tuple[QConnector, Q] | tuple[str, Any]] = []
         self.connector = QConnector.AND
         self.negated = False
@@ -21,21 +37,31 @@ class Q:
         for key, value in kwargs.items():
             self.children.append((key, value))
 
-    def to_cypher(self, node_alias: str, param_counter: list[int]) -> tuple[str, dict]:
-        """Tłumaczy obiekt Q na fragment zapytania Cypher i parametry."""
+    def to_cypher(
+        self,
+        node_alias: str,
+        param_counter: list[int],
+        out_params: dict | None = None,
+    ) -> tuple[str, dict]:
+        """
+        Tłumaczy obiekt Q na fragment zapytania Cypher i parametry.
+
+        :param out_params: Słownik, do którego trafiają parametry. Zagnieżdżone
+                           obiekty Q dostają ten sam słownik, zamiast budować
+                           własne i scalać je przez `update`.
+        """
+        params = {} if out_params is None else out_params
         if not self.children:
-            return "", {}
+            return "", params
 
         parts = []
-        params = {}
 
         for child in self.children:
             if isinstance(child, Q):
                 # Zagnieżdżony obiekt Q
-                cypher, child_params = child.to_cypher(node_alias, param_counter)
+                cypher, _ = child.to_cypher(node_alias, param_counter, params)
                 if cypher:
                     parts.append(f"({cypher})")
-                    params.update(child_params)
             else:
                 # Krotka (klucz, wartość)
                 key, value = child
@@ -53,22 +79,45 @@ class Q:
             return f"NOT ({cypher_str})", params
         return cypher_str, params
 
+    def _signature(self) -> tuple:
+        """
+        Hashowalny opis struktury drzewa warunków (bez wartości). Dwa obiekty Q
+        o tym samym kształcie dają ten sam Cypher - różnią się tylko parametrami.
+        """
+        return self._shape([])
+
+    def _shape(self, values: list) -> tuple:
+        """
+        Zwraca sygnaturę drzewa (jak `_signature`) i w tym samym przebiegu
+        dopisuje do `values` wartości warunków w kolejności, w jakiej
+        `to_cypher` numeruje parametry.
+        """
+        children = []
+        for child in self.children:
+            if isinstance(child, Q):
+                children.append(child._shape(values))
+            else:
+                children.append(child[0])
+                values.append(child[1])
+        return (self.connector, self.negated, tuple(children))
+
+    @classmethod
+    def _from_signature(cls, signature: tuple) -> Q:
+        """Odtwarza obiekt Q o danym kształcie (z pustymi wartościami)."""
+        connector, negated, children = signature
+        q_obj = cls()
+        q_obj.connector = connector
+        q_obj.negated = negated
+        q_obj.children = [
+            cls._from_signature(child) if isinstance(child, tuple) else (child, None)
+            for child in children
+        ]
+        return q_obj
+
     def _compile_clause(self, node_alias: str, key: str, param_name: str) -> str:
         """Kompiluje pojedynczy warunek, np. 'node.age > $p_1'."""
-        operator_map = {
-            "gt": ">",
-            "gte": ">=",
-            "lt": "<",
-            "lte": "<=",
-            "in": "IN",
-            "contains": "CONTAINS",
-            "startswith": "STARTS WITH",
-            "endswith": "ENDS WITH",
-            "ne": "<>",
-        }
-
         field, _, op_suffix = key.partition("__")
-        op = operator_map.get(op_suffix, "=")
+        op = _OPERATOR_MAP.get(op_suffix, "=")
 
         return f"{node_alias}.`{field}` {op} ${param_name}"
 
@@ -84,12 +133,20 @@ class Q:
         if not other.children:
             return self
 
+        # Łączenie jest łączne, więc zamiast zagnieżdżać drzewa o tym samym
+        # łączniku scalamy ich dzieci: Q(a=1) & Q(b=2) & Q(c=3) daje jeden
+        # poziom "a AND b AND c" zamiast "((a) AND (b)) AND (c)"
         new_q = Q()
         new_q.connector = connector
-        new_q.children.append(self)
-        new_q.children.append(other)
+        new_q.children = [*self._operands(connector), *other._operands(connector)]
         return new_q
 
+    def _operands(self, connector: QConnector) -> list:
+        """Dzieci, które można wstawić bezpośrednio pod węzeł z łącznikiem `connector`."""
+        if not self.negated and (self.connector == connector or len(self.children) == 1):
+            return self.children
+        return [self]
+
     def __and__(self, other: Q) -> Q:
         return self._combine(other, QConnector.AND)
 
@@ -98,8 +155,9 @@ class Q:
 
     def __invert__(self) -> Q:
         new_q = Q()
-        # Kopiujemy dzieci, aby nie modyfikować oryginału
-        new_q.children = list(self.children)
+        # Lista dzieci jest współdzielona, a nie kopiowana - po utworzeniu
+        # obiektu Q nie jest już modyfikowana (_combine buduje nową listę)
+        new_q.children = self.children
         new_q.connector = self.connector
         new_q.negated = not self.negated
         return new_q
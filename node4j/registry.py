@@ -1,4 +1,5 @@
-from typing import Dict, Type, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Dict, Mapping, Type, TYPE_CHECKING
 
 # Używamy TYPE_CHECKING do uniknięcia cyklicznych importów
 # podczas sprawdzania typów. W czasie wykonania ten blok jest ignorowany.
@@ -8,4 +9,33 @@ if TYPE_CHECKING:
 # Globalny rejestr mapujący etykiety (string) na klasy modeli (type).
 # Zostanie on automatycznie zapełniony przez metaklasę NodeBase.
 # Przykład po inicjalizacji: {'Person': <class 'main.Person'>, 'Company': <class 'main.Company'>}
-node_registry: Dict[str, Type["Node"]] = {}
+_node_registry: Dict[str, Type["Node"]] = {}
+
+# Publiczny, tylko-do-odczytu widok rejestru. Modyfikacje odbywają się
+# wyłącznie przez `register_node`.
+node_registry: Mapping[str, Type["Node"]] = MappingProxyType(_node_registry)
+
+_frozen = False
+
+
+def register_node(cls: Type["Node"]) -> None:
+    """Rejestruje klasę modelu pod jej nazwą. Wywoływane przez metaklasę NodeBase."""
+    if _frozen:
+        raise RuntimeError(
+            f"Rejestr modeli jest zamrożony - nie można zarejestrować '{cls.__name__}'."
+        )
+    _node_registry[cls.__name__] = cls
+
+
+def freeze_registry() -> None:
+    """
+    Zamraża rejestr modeli. Należy wywołać na starcie aplikacji, po
+    zaimportowaniu wszystkich modeli - od tego momentu rejestr jest niezmienny.
+    Przy okazji rozwiązuje modele docelowe wszystkich relacji, więc brakujący
+    model jest zgłaszany tutaj (TypeError), a nie przy pierwszym zapytaniu.
+    """
+    global _frozen
+    for model in _node_registry.values():
+        for relationship in model._relationships.values():
+            relationship.target_class
+    _frozen = True
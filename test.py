@@ -7,12 +7,13 @@ import sys
 import logging
 import structlog
 import neo4j # <-- KLUCZOWA POPRAWKA
+import pydantic
 
 from node4j.db import connection
 from node4j.nodes import Node
 from node4j.mixins import TTLMixin, SoftDeleteMixin
 from node4j.managers import SoftDeleteManager
-from node4j.models import Person, Company, Employee, WorkAt, Post, Tag, AuditLog
+from node4j.models import Person, Company, Employee, WorkAt, Post, Tag, AuditLog, audit_log_batch
 from node4j.query import Q
 
 # ==============================================================================
@@ -76,6 +77,65 @@ root_logger.addHandler(file_handler)
 
 # Tworzymy główny logger dla naszego skryptu testowego
 log = structlog.get_logger("test_script")
+
+# Zapytania ad-hoc skryptu - stały tekst, a wartości wyłącznie w parametrach
+DROP_TTL_JOB_CYPHER = "CALL apoc.periodic.drop($job_name)"
+SET_TTL_CYPHER = "MATCH (n:TemporarySession {uid: $uid}) SET n.ttl = $ttl_value"
+TTL_CLEANUP_CYPHER = (
+    "MATCH (n:TemporarySession) WHERE n.ttl IS NOT NULL AND n.ttl < datetime() "
+    "DETACH DELETE n RETURN count(n) as c"
+)
+# Etykiety węzłów tworzonych przez skrypt - czyścimy tylko je (NodeByLabelScan),
+# zamiast skanować cały graf przez `MATCH (n)`
+TEST_LABELS = (
+    "Person", "Company", "Employee", "Post", "Tag", "AuditLog",
+    "SecretDocument", "TemporarySession",
+)
+LABEL_CLEANUP_CYPHER = [f"MATCH (n:`{label}`) DETACH DELETE n" for label in TEST_LABELS]
+
+
+def check_query_shapes():
+    """
+    Sprawdza (bez bazy) klauzule WHERE budowane przez menedżer: spłaszczanie
+    i negację obiektów Q oraz to, że szablon zapamiętany dla kształtu filtrów
+    jest poprawny także dla innych wartości.
+    """
+    where = Person.q._where_statement
+    uid = uuid.uuid4()
+
+    # Łańcuch jednego spójnika jest spłaszczany - bez zagnieżdżonych nawiasów
+    assert where("node", Q(name="A") & Q(age=1) & Q(age__gt=0)) == (
+        "WHERE node.`name` = $p_0 AND node.`age` = $p_1 AND node.`age` > $p_2",
+        {"p_0": "A", "p_1": 1, "p_2": 0},
+    )
+    assert where("node", (Q(name="A") | Q(name="B")) | Q(age__lt=3)) == (
+        "WHERE node.`name` = $p_0 OR node.`name` = $p_1 OR node.`age` < $p_2",
+        {"p_0": "A", "p_1": "B", "p_2": 3},
+    )
+    # Zanegowane drzewo nie jest wchłaniane przez rodzica
+    assert where("node", ~(Q(name="A") | Q(age=1)) & Q(age__gt=0)) == (
+        "WHERE (NOT (node.`name` = $p_0 OR node.`age` = $p_1)) AND node.`age` > $p_2",
+        {"p_0": "A", "p_1": 1, "p_2": 0},
+    )
+    assert where("node", ~~Q(name="A")) == ("WHERE node.`name` = $p_0", {"p_0": "A"})
+    assert where("node", Q()) == ("", {})
+
+    # Ten sam kształt z innymi wartościami: ten sam tekst, nowe parametry,
+    # zgodne z kompilacją bez cache'u (Q.to_cypher)
+    for name, age in (("A", 1), ("Z", 99)):
+        q_obj = Q(name=name) & ~Q(age__in=[age])
+        cypher, params = q_obj.to_cypher("node", [0])
+        assert where("node", q_obj) == (f"WHERE {cypher}", params)
+        assert params == {"p_0": name, "p_1": [age]}
+
+    # Słowniki: kolejność kluczy nie zmienia zapytania, UUID trafia jako tekst
+    assert where("node", {"name": "A", "age__gte": 2}) == (
+        "WHERE node.`age` >= $p_0 AND node.`name` = $p_1", {"p_0": 2, "p_1": "A"}
+    )
+    assert where("node", {"age__gte": 3, "name": "B"}) == (
+        "WHERE node.`age` >= $p_0 AND node.`name` = $p_1", {"p_0": 3, "p_1": "B"}
+    )
+    assert where("node", {"uid": uid}) == ("WHERE node.`uid` = $p_0", {"p_0": str(uid)})
 # ==============================================================================
 
 
@@ -84,31 +144,43 @@ async def main():
 
     try:
         await connection.connect()
+        # Otwieramy połączenia puli z góry, aby pierwsze zapytania testów nie
+        # płaciły za nawiązanie połączenia Bolt
+        await connection.warmup(10)
 
         # --- 1. Czyszczenie Bazy Danych I SCHEMATU ---
         log.info("--- 1. Cleaning database and schema ---")
-        await connection.run("MATCH (n) DETACH DELETE n")
-        try:
-            await connection.run("CALL apoc.schema.assert({}, {}, true) YIELD label, key, keys, unique, action RETURN *")
-            log.info("Cleaned all indexes and constraints using APOC.")
-        except Exception as e:
-            log.warning(f"Failed to clean schema with APOC, attempting manual drop.", error=str(e))
-            await connection.run("DROP CONSTRAINT constraint_Person_email IF EXISTS")
-            await connection.run("DROP CONSTRAINT constraint_Company_name IF EXISTS")
-            await connection.run("DROP INDEX index_Person_name IF EXISTS")
-
-        try:
-            await connection.run("CALL apoc.periodic.drop('ttl_cleanup_job')")
-            log.info("Removed existing TTL job 'ttl_cleanup_job'.")
-        except:
-            pass
+        # Neo4j nie pozwala łączyć zmian schematu i zapisów danych w jednej
+        # transakcji: dane usuwamy w jednej transakcji, a schemat osobno - w
+        # jednej współdzielonej sesji, zamiast otwierać nową dla każdego zapytania
+        has_apoc = await connection.has_apoc()
+        async with connection.transaction():
+            for statement in LABEL_CLEANUP_CYPHER:
+                await connection.run(statement)
+        async with connection.session():
+            if has_apoc:
+                await connection.run("CALL apoc.schema.assert({}, {}, true) YIELD label, key, keys, unique, action RETURN *")
+                log.info("Cleaned all indexes and constraints using APOC.")
+                await connection.run(DROP_TTL_JOB_CYPHER, {"job_name": "ttl_cleanup_job"})
+                log.info("Removed existing TTL job 'ttl_cleanup_job'.")
+            else:
+                log.warning("APOC is not available, dropping schema manually.")
+                for statement in (
+                    "DROP CONSTRAINT constraint_Person_email IF EXISTS",
+                    "DROP CONSTRAINT constraint_Company_name IF EXISTS",
+                    "DROP INDEX index_Person_name IF EXISTS",
+                ):
+                    await connection.run(statement)
 
         log.info("Database has been cleaned.")
 
         # --- APLIKOWANIE SCHEMATU Z MODELI ---
-        await Person.q.apply_schema()
-        await Company.q.apply_schema()
-        await Post.q.apply_schema()
+        # Schematy różnych modeli są niezależne - wysyłamy je współbieżnie
+        await asyncio.gather(
+            Person.q.apply_schema(),
+            Company.q.apply_schema(),
+            Post.q.apply_schema(),
+        )
 
         # --- 2. Tworzenie węzłów i testowanie ograniczeń ---
         log.info("--- 2. Creating nodes and testing constraints ---")
@@ -122,26 +194,46 @@ async def main():
         except neo4j.exceptions.ConstraintError as e: 
             log.info("Attempt to create person with duplicate email correctly failed.", error_type=type(e).__name__)
             
-        bob = await Person.q.create(name="Bob", age=40)
-        charlie = await Person.q.create(name="Charlie", age=35)
-        
-        neo_inc = await Company.q.create(name="Neo4j Inc.", founded_in=2007)
+        # Jedno zapytanie UNWIND na model (bulk_create zwraca instancje z uid),
+        # a oba modele zapisujemy współbieżnie. Wpisy audytowe z haków Person
+        # trafiają do bazy jednym zapytaniem przy wyjściu z audit_log_batch
+        async with audit_log_batch():
+            (bob, charlie), (neo_inc, acme_corp) = await asyncio.gather(
+                Person.q.bulk_create([{"name": "Bob", "age": 40}, {"name": "Charlie", "age": 35}]),
+                Company.q.bulk_create(
+                    [{"name": "Neo4j Inc.", "founded_in": 2007}, {"name": "Acme Corp.", "founded_in": 1950}]
+                ),
+            )
+        assert await AuditLog.q.count({"target_uid__in": [bob.uid_str, charlie.uid_str]}) == 2
+
         try:
             await Company.q.create(name="Neo4j Inc.", founded_in=2010)
             raise AssertionError("Constraint on company name did not work!")
         except neo4j.exceptions.ConstraintError as e:
             log.info("Attempt to create company with duplicate name correctly failed.", error_type=type(e).__name__)
-        
-        acme_corp = await Company.q.create(name="Acme Corp.", founded_in=1950)
+
         log.info("Created remaining test data", data_summary=f"{bob}, {charlie}, {neo_inc}, {acme_corp}")
 
         # --- 3. Tworzenie Relacji ---
         log.info("--- 3. Creating relationships ---")
-        await Person.q.connect(alice.uid, neo_inc.uid, "WORK_AT", properties={"role": "Engineer", "start_year": 2020})
-        await Person.q.connect(bob.uid, neo_inc.uid, "WORK_AT", properties={"role": "Manager", "start_year": 2018})
-        await Person.q.connect(charlie.uid, acme_corp.uid, "WORK_AT", properties={"role": "Sales", "start_year": 2021})
-        await Person.q.connect(alice.uid, bob.uid, "KNOWS")
-        log.info("Relationships created.")
+        # Jedno zapytanie UNWIND na typ relacji zamiast osobnego connect na parę,
+        # oba w jednej transakcji (jeden commit)
+        @connection.atomic()
+        async def create_initial_relationships():
+            work_at = await Person.q.bulk_connect(
+                [
+                    (alice.uid, neo_inc.uid, {"role": "Engineer", "start_year": 2020}),
+                    (bob.uid, neo_inc.uid, {"role": "Manager", "start_year": 2018}),
+                    (charlie.uid, acme_corp.uid, {"role": "Sales", "start_year": 2021}),
+                ],
+                "WORK_AT",
+            )
+            knows = await Person.q.bulk_connect([(alice.uid, bob.uid, None)], "KNOWS")
+            return work_at, knows
+
+        work_at_count, knows_count = await create_initial_relationships()
+        assert (work_at_count, knows_count) == (3, 1)
+        log.info("Relationships created.", work_at=work_at_count, knows=knows_count)
 
         # --- 4. Wyszukiwanie ---
         log.info("--- 4. Basic search ---")
@@ -150,9 +242,16 @@ async def main():
 
         # --- 5. Aktualizacja ---
         log.info("--- 5. Updating ---")
-        await Person.q.update(filters={"uid": str(bob.uid)}, data={"age": 41})
-        bob_updated = await Person.q.match_one(filters={"uid": str(bob.uid)})
+        # update_returning zwraca zaktualizowane węzły - bez ponownego match_one
+        [bob_updated] = await Person.q.update_returning(filters={"uid": bob.uid}, data={"age": 41})
         log.info(f"Bob's age after update", age=bob_updated.age)
+        # Szybka ścieżka (model bez haków) odrzuca nieznane pola i błędne typy
+        for bad_data in ({"unknown_field": 1}, {"founded_in": "not a year"}):
+            try:
+                await Company.q.update(filters={"uid": neo_inc.uid}, data=bad_data)
+                raise AssertionError(f"Update accepted invalid data: {bad_data}")
+            except (ValueError, pydantic.ValidationError):
+                pass
 
         # --- 6. Usuwanie ---
         log.info("--- 6. Deleting ---")
@@ -161,16 +260,21 @@ async def main():
 
         # --- 7. Relacje ---
         log.info("--- 7. Testing relationships ---")
-        alice_reloaded = await Person.q.match_one(filters={"name": "Alice"})
-        alice_works_at = await alice_reloaded.works_at
-        log.info("Alice works at", data=[(str(n), p.model_dump()) for n, p in alice_works_at])
+        # Instancje z sekcji 2 mają już uid i elementId - nie wyszukujemy ich ponownie
+        alice_works_at = await alice.works_at
+        # model_dump dla każdej relacji liczymy tylko, gdy log zostanie wyemitowany
+        if log.isEnabledFor(logging.INFO):
+            log.info("Alice works at", data=[(str(n), p.model_dump()) for n, p in alice_works_at])
 
         # --- 8. Relacje przychodzące ---
         log.info("--- 8. Testing incoming relationships ---")
-        neo_inc_reloaded = await Company.q.match_one(filters={"name": "Neo4j Inc."})
-        employees_data = await neo_inc_reloaded.employees
+        employees_data = await neo_inc.employees
         employee_names = [node.name for node, props in employees_data]
         log.info("Employees at Neo4j Inc.", names=employee_names)
+        # Data ustawiona w haku pre_save wraca przez relację jako datetime
+        employee_alice = next(node for node, _ in employees_data if node.name == "Alice")
+        assert isinstance(employee_alice.last_modified, datetime.datetime)
+        assert employee_alice.last_modified == alice.last_modified
 
         # --- 9. Węzły z wieloma etykietami ---
         log.info("--- 9. Testing nodes with multiple labels ---")
@@ -181,8 +285,8 @@ async def main():
         log.info("Found Diana via Employee.q", result=found_diana is not None)
         assert found_diana is not None
 
-        all_people = await Person.q.match_all()
-        person_names = {p.name for p in all_people}
+        # Potrzebujemy tylko imion - bez hydratacji pełnych węzłów
+        person_names = set(await Person.q.values_list("name", flat=True))
         log.info("All people in DB", names=person_names)
         assert "Diana" in person_names
 
@@ -193,31 +297,44 @@ async def main():
         # --- Pozostałe testy...
         # ... (Dla zwięzłości, kontynuuję z logami, ale pomijam szczegółowe asercje z oryginalnego pliku)
         log.info("--- 10. Advanced filtering ---")
-        people_over_35 = await Person.q.match_all(filters={"age__gt": 35})
-        log.info("People over 35", names=[p.name for p in people_over_35])
+        names_over_35 = await Person.q.values_list("name", filters={"age__gt": 35}, flat=True)
+        log.info("People over 35", names=names_over_35)
 
         log.info("--- 11. Relationship properties ---")
         await Person.q.connect(alice.uid, acme_corp.uid, "WORK_AT", properties={"role": "Consultant", "start_year": 2022})
-        alice_reloaded = await Person.q.match_one(filters={"name": "Alice"})
-        works_at_data = await alice_reloaded.works_at
-        log.info("Alice's work data", data=[(str(n), p.model_dump()) for n, p in works_at_data])
+        # Relację dodał menedżer modelu, więc zapamiętane dane instancji są nieaktualne
+        alice.clear_relationship_cache()
+        works_at_data = await alice.works_at
+        if log.isEnabledFor(logging.INFO):
+            log.info("Alice's work data", data=[(str(n), p.model_dump()) for n, p in works_at_data])
 
         log.info("--- 12. Disconnecting relationships ---")
-        bob_reloaded = await Person.q.match_one(filters={"name": "Bob"})
-        await Person.q.disconnect(alice_reloaded.uid, bob_reloaded.uid, "KNOWS")
+        await Person.q.disconnect(alice.uid, bob.uid, "KNOWS")
         log.info("Disconnected Alice from Bob.")
 
         log.info("--- 13. Prefetching (Eager Loading) ---")
-        all_people_with_companies = await Person.q.match_all(prefetch=["works_at"])
-        log.info("Fetched all people with companies prefetched", count=len(all_people_with_companies))
+        # Potrzebujemy tylko liczby - węzły przetwarzamy w miarę napływania,
+        # bez trzymania całej listy w pamięci
+        people_with_companies_count = 0
+        async for _person in Person.q.iter_all(prefetch=["works_at"]):
+            people_with_companies_count += 1
+        log.info("Fetched all people with companies prefetched", count=people_with_companies_count)
         
         log.info("--- 14. Nested Prefetching ---")
-        tester = await Person.q.create(name="Tester", age=99)
-        post1 = await Post.q.create(title="Post 1", content="...")
-        tag_tech = await Tag.q.create(name="Tech")
-        await Person.q.connect(tester.uid, post1.uid, "WROTE")
-        await Post.q.connect(post1.uid, tag_tech.uid, "HAS_TAG")
+        tester, post1, tag_tech = await asyncio.gather(
+            Person.q.create(name="Tester", age=99),
+            Post.q.create(title="Post 1", content="..."),
+            Tag.q.create(name="Tech"),
+        )
+        async with connection.transaction():
+            await Person.q.connect(tester.uid, post1.uid, "WROTE")
+            await Post.q.connect(post1.uid, tag_tech.uid, "HAS_TAG")
         tester_hydrated = await Person.q.match_one(filters={"name": "Tester"}, prefetch={"posts": {"tags": {}}})
+        # Cały poziom posts -> tags przychodzi w jednym zapytaniu (zagnieżdżone
+        # pattern comprehensions); poniższe odwołania korzystają z cache'u
+        tester_posts = await tester_hydrated.posts
+        post_tags = await tester_posts[0][0].tags
+        assert [tag.name for tag, _ in post_tags] == ["Tech"]
         log.info("Fetched tester with nested posts and tags.", tester_uid=str(tester_hydrated.uid))
         
         log.info("--- 15. get_or_create ---")
@@ -229,29 +346,33 @@ async def main():
         log.info("update_or_create for 'Innovate LLC'", created=created, company_name=new_comp.name, founded=new_comp.founded_in)
 
         log.info("--- 17. Sorting (order_by) ---")
-        people_by_name_asc = await Person.q.match_all(order_by=["name"])
-        log.info("People sorted by name asc", names=[p.name for p in people_by_name_asc])
+        names_by_name_asc = await Person.q.values_list("name", order_by=["name"], flat=True)
+        log.info("People sorted by name asc", names=names_by_name_asc)
 
         log.info("--- 18. Aggregations ---")
-        person_count = await Person.q.count()
-        log.info("Total person count", count=person_count)
-        age_stats = await Person.q.aggregate(avg_age="avg(age)", oldest="max(age)")
+        # Liczność i statystyki wieku z jednego skanu, w jednym zapytaniu
+        age_stats = await Person.q.aggregate(total="count(*)", avg_age="avg(age)", oldest="max(age)")
+        log.info("Total person count", count=age_stats["total"])
         log.info("Age statistics", stats=age_stats)
 
         log.info("--- 19. Lifecycle Hooks ---")
         eve, created = await Person.q.get_or_create(filters={"name": "Eve"}, defaults={"age": 25})
-        create_log_entry = await AuditLog.q.match_one(filters={"target_uid": str(eve.uid), "action": "CREATE"})
+        create_log_entry = await AuditLog.q.match_one(filters={"target_uid": eve.uid, "action": "CREATE"})
         log.info("Lifecycle hook test: CREATE", eve_last_modified=eve.last_modified, audit_log_exists=(create_log_entry is not None))
-        await Person.q.delete(filters={"uid": str(eve.uid)})
+        await Person.q.delete(filters={"uid": eve.uid})
         log.info("Lifecycle hook test: DELETE complete.")
 
         log.info("--- 20. Bulk Operations ---")
-        created_tags = await Tag.q.bulk_create([{"name": f"BulkTag{i}"} for i in range(3)])
+        @connection.atomic()
+        async def run_bulk_operations():
+            tags = await Tag.q.bulk_create([{"name": f"BulkTag{i}"} for i in range(3)])
+            # Inkrementacja po stronie bazy - bez pobierania węzłów i bulk_update
+            count = await Person.q.increment({"name__in": ["Alice", "Bob"]}, "age")
+            return tags, count
+
+        created_tags, updated_count = await run_bulk_operations()
         log.info("bulk_create result", count=len(created_tags))
-        people_to_update = await Person.q.match_all(filters={"name__in": ["Alice", "Bob"]})
-        update_data = [{"uid": str(p.uid), "age": p.age + 1} for p in people_to_update]
-        updated_count = await Person.q.bulk_update(update_data, match_on="uid")
-        log.info("bulk_update result", count=updated_count)
+        log.info("increment result", count=updated_count)
 
         log.info("--- 21. Instance Relationship Management ---")
         dave = await Employee.q.create(name="Dave", age=45)
@@ -270,8 +391,14 @@ async def main():
         async def transfer_employee(employee_name: str, from_company_name: str, to_company_name: str):
             log.info("Starting atomic transaction...", employee=employee_name)
             employee = await Person.q.match_one(filters={"name": employee_name})
-            from_company = await Company.q.match_one(filters={"name": from_company_name})
-            to_company = await Company.q.match_one(filters={"name": to_company_name})
+            # Obie firmy jednym zapytaniem zamiast dwóch match_one
+            companies = {
+                company.name: company
+                for company in await Company.q.match_all(
+                    filters={"name__in": [from_company_name, to_company_name]}
+                )
+            }
+            from_company, to_company = companies[from_company_name], companies[to_company_name]
             await employee.works_at.disconnect(from_company)
             await employee.works_at.connect(to_company, properties={"role": "Senior Engineer"})
             if employee_name == "Dave":
@@ -286,8 +413,8 @@ async def main():
             log.info("Caught expected error for rollback test.")
 
         log.info("--- 23. Advanced Filtering with Q Objects ---")
-        young_or_old = await Person.q.match_all(filters=Q(age__lt=30) | Q(age__gt=90))
-        log.info("People < 30 or > 90", names={p.name for p in young_or_old})
+        young_or_old = await Person.q.values_list("name", filters=Q(age__lt=30) | Q(age__gt=90), flat=True)
+        log.info("People < 30 or > 90", names=set(young_or_old))
         
         log.info("--- 24. SoftDeleteMixin ---")
         class SecretDocument(SoftDeleteMixin, Node):
@@ -301,6 +428,9 @@ async def main():
         log.info("Active document count", count=active_count)
         all_count = await SecretDocument.all_objects.count()
         log.info("Total document count (including deleted)", count=all_count)
+        # bulk_update menedżera SoftDeleteManager pomija usunięte węzły
+        skipped_count = await SecretDocument.q.bulk_update([{"uid": doc1.uid_str, "title": "Zmieniona"}])
+        assert skipped_count == 0
         await doc1.restore()
         log.info("Restored the document.")
         
@@ -310,11 +440,73 @@ async def main():
         await TTLMixin.setup_ttl_infrastructure()
         session_to_expire = await TemporarySession.q.create(session_id="123")
         past_datetime = datetime.datetime.now(datetime.timezone.utc) + timedelta(seconds=-5)
-        await connection.run("MATCH (n:TemporarySession {uid: $uid}) SET n.ttl = $ttl_value", {"uid": str(session_to_expire.uid), "ttl_value": past_datetime})
-        cleanup_query = "MATCH (n:TemporarySession) WHERE n.ttl IS NOT NULL AND n.ttl < datetime() DETACH DELETE n RETURN count(n) as c"
-        result = await connection.run(cleanup_query)
+        # Surowe `connection.run` nie konwertuje parametrów (jak filtry menedżera),
+        # więc uid przekazujemy jako tekst - w takiej postaci jest zapisany w bazie
+        await connection.run(SET_TTL_CYPHER, {"uid": session_to_expire.uid_str, "ttl_value": past_datetime})
+        result = await connection.run(TTL_CLEANUP_CYPHER)
         log.info("Ran TTL cleanup query", deleted_count=result[0]['c'])
-        
+
+        log.info("--- 26. Query shapes (Q objects and filter cache) ---")
+        check_query_shapes()
+        log.info("Query shape checks passed.")
+
+        log.info("--- 27. Manager API ---")
+        api_tags = await Tag.q.bulk_create([{"name": f"ApiTag{i}"} for i in range(3)])
+        api_uids = [tag.uid for tag in api_tags]
+
+        # match_in: duplikaty są pomijane, UUID konwertowane centralnie
+        matched = await Tag.q.match_in("uid", [*api_uids, api_uids[0]])
+        assert {tag.uid for tag in matched} == set(api_uids)
+        assert await Tag.q.match_in("name", []) == []
+
+        # values_list: krotki w kolejności pól albo płaska lista dla jednego pola
+        api_names = ["ApiTag0", "ApiTag1", "ApiTag2"]
+        assert await Tag.q.values_list(
+            "name", filters={"name__startswith": "ApiTag"}, order_by=["name"], flat=True
+        ) == api_names
+        assert await Tag.q.values_list("uid", "name", filters={"uid": api_uids[0]}) == [
+            (api_tags[0].uid_str, "ApiTag0")
+        ]
+
+        # iter_all: te same wyniki co match_all, także przy małych paczkach
+        streamed = [
+            tag.name
+            async for tag in Tag.q.iter_all(
+                filters={"name__startswith": "ApiTag"}, order_by=["name"], batch_size=2
+            )
+        ]
+        assert streamed == api_names
+
+        # exists
+        assert await Tag.q.exists({"name": "ApiTag1"})
+        assert not await Tag.q.exists({"name": "NoSuchTag"})
+
+        # update_returning: zwraca zaktualizowane węzły (lub pustą listę)
+        [renamed] = await Tag.q.update_returning({"uid": api_uids[0]}, {"name": "ApiTag0-renamed"})
+        assert (renamed.uid, renamed.name) == (api_uids[0], "ApiTag0-renamed")
+        assert await Tag.q.update_returning({"name": "NoSuchTag"}, {"name": "x"}) == []
+
+        # increment: po stronie bazy, zwraca liczbę zmienionych węzłów
+        api_corp = await Company.q.create(name="Api Corp", founded_in=2000)
+        assert await Company.q.increment({"uid": api_corp.uid}, "founded_in", by=5) == 1
+        assert await Company.q.values_list("founded_in", filters={"uid": api_corp.uid}, flat=True) == [2005]
+
+        # bulk_connect / bulk_update_relationship / bulk_disconnect
+        api_post = await Post.q.create(title="API", content="...")
+        api_pairs = [(api_post.uid, uid) for uid in api_uids]
+        assert await Post.q.bulk_connect(
+            [(post_uid, tag_uid, {"tagged_by": "api"}) for post_uid, tag_uid in api_pairs], "HAS_TAG"
+        ) == 3
+        assert await Post.q.bulk_update_relationship(
+            [(api_post.uid, api_uids[0], {"tagged_by": "admin"})], "HAS_TAG"
+        ) == 1
+        tagged_by = {tag.uid: props.tagged_by for tag, props in await api_post.tags}
+        assert tagged_by == {api_uids[0]: "admin", api_uids[1]: "api", api_uids[2]: "api"}
+        assert await Post.q.bulk_disconnect(api_pairs, "HAS_TAG") == 3
+        api_post.clear_relationship_cache()
+        assert await api_post.tags == []
+        log.info("Manager API checks passed.")
+
         log.info(">>> All tests completed successfully! <<<", fg="green")
 
     except Exception as e: